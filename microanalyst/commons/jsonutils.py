@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Utilities for writing JSON passed between the scripts.
+
+Output is indented with sorted keys by default. The compact mode, enabled
+with the "--compact" flag or the MICROANALYST_COMPACT environment variable,
+emits minified JSON instead, which is several times smaller and faster to
+both dump and parse in the next stage of a pipeline:
+$ export MICROANALYST_COMPACT=1
+$ group.py series1/*.xls | assemble.py | genes.py genes.json > data.json
+
+Floats are always written in their shortest round-trip form.
+"""
+
+import os
+import sys
+import json
+
+COMPACT_VARIABLE = 'MICROANALYST_COMPACT'
+
+# write standard output in chunks of this many characters
+CHUNK_SIZE = 1024 * 1024
+
+# nesting level down to which containers are split into separate chunks
+_CHUNK_DEPTH = 4
+
+# C-accelerated, unlike indented output or sorted keys
+_COMPACT_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+
+def is_compact(compact=None):
+    """Return the flag or the value of the environment variable if None."""
+
+    if compact is None:
+        return os.environ.get(COMPACT_VARIABLE, '') not in ('', '0')
+
+    return compact
+
+
+def dump(json_data, file_handle=None, compact=None, sort_keys=True):
+    """Write JSON followed by a newline to a file or the standard output.
+
+    Keys are only sorted in the indented output.
+    """
+
+    writer = _ChunkedWriter(sys.stdout if file_handle is None
+                            else file_handle)
+
+    if is_compact(compact):
+        for chunk in _iterencode(json_data, _CHUNK_DEPTH):
+            writer.write(chunk)
+    else:
+        json.dump(json_data, writer, indent=4, sort_keys=sort_keys)
+
+    writer.write('\n')
+    writer.flush()
+
+
+def _iterencode(value, depth):
+    """Yield minified JSON of the outer containers piece by piece."""
+
+    if depth > 0 and isinstance(value, dict) and _is_nested(value.values()) \
+            and all(isinstance(x, basestring) for x in value):
+
+        yield '{'
+        for i, key in enumerate(value):
+            if i:
+                yield ','
+            yield _COMPACT_ENCODER.encode(key) + ':'
+            for chunk in _iterencode(value[key], depth - 1):
+                yield chunk
+        yield '}'
+
+    elif depth > 0 and isinstance(value, (list, tuple)) and _is_nested(value):
+
+        yield '['
+        for i, item in enumerate(value):
+            if i:
+                yield ','
+            for chunk in _iterencode(item, depth - 1):
+                yield chunk
+        yield ']'
+
+    else:
+        yield _COMPACT_ENCODER.encode(value)
+
+
+def _is_nested(items):
+    """Return True if any of the items is a container itself."""
+    return any(isinstance(x, (dict, list, tuple)) for x in items)
+
+
+class _ChunkedWriter(object):
+    """File-like object joining small pieces of text into large chunks."""
+
+    def __init__(self, file_handle, chunk_size=CHUNK_SIZE):
+        self._file = file_handle
+        self._chunk_size = chunk_size
+        self._pieces = []
+        self._length = 0
+
+    def write(self, text):
+        self._pieces.append(text)
+        self._length += len(text)
+        if self._length >= self._chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self._pieces:
+            self._file.write(''.join(self._pieces))
+            self._pieces = []
+            self._length = 0
+        self._file.flush()
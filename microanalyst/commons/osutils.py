@@ -31,6 +31,7 @@ import sys
 import subprocess
 import platform
 import tempfile
+import multiprocessing
 
 from microanalyst.commons import uniutils
 
@@ -77,6 +78,15 @@ def open_with_default_app(filename):
         print >> sys.stderr, 'Unknown operating system:', os_name
 
 
+def num_processes(jobs):
+    """Return number of worker processes where 0 stands for all CPU cores."""
+
+    if jobs < 0:
+        raise ValueError('Number of jobs must not be negative: %d' % jobs)
+
+    return jobs or multiprocessing.cpu_count()
+
+
 def expand(filenames):
     """Expand wild-cards in filenames (notably for Windows)."""
 
@@ -26,12 +26,19 @@
 Miscellaneous utilities for Unicode handling.
 """
 
+import re
 import sys
+import codecs
 import locale
 import unicodedata
 
 from glob import glob as ascii_glob
 
+# number of bytes decoded at a time
+CHUNK_SIZE = 1024 * 1024
+
+_NON_ASCII = re.compile(r'[\x80-\xff]')
+
 
 class SysEncoding(object):
     """Character encodings used by this operating system.
@@ -97,6 +104,65 @@ def stdin():
     return _decode(sys.stdin.readlines(), SysEncoding().command_line)
 
 
+def read_stdin():
+    """Return standard input as a single UTF-8 string, e.g. for json.loads.
+
+    Unlike u''.join(stdin()) this holds a single copy of the input in
+    memory as long as it is pure ASCII, which is the case for JSON printed
+    by the scripts since they escape non-ASCII characters.
+    """
+    return read(sys.stdin, SysEncoding().command_line)
+
+
+def read(file_handle, encoding='utf-8', chunk_size=CHUNK_SIZE):
+    """Return contents of a file in NFC encoded with UTF-8 as a single str.
+
+    Non-ASCII input is decoded incrementally one chunk at a time and
+    chunks which turn out to be pure ASCII are not normalized.
+    """
+
+    data = file_handle.read()
+
+    if not _NON_ASCII.search(data):
+        return data
+
+    chunks = [_encode_nfc(x) for x in _iterdecode(data, encoding, chunk_size)]
+    del data
+
+    return ''.join(chunks)
+
+
+def _iterdecode(data, encoding, chunk_size):
+    """Yield Unicode chunks split before ASCII characters."""
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = u''
+
+    for start in xrange(0, len(data), chunk_size):
+
+        text = pending + decoder.decode(data[start:start + chunk_size])
+
+        # hold back the tail from the last ASCII character onwards, which
+        # may compose with combining characters at the start of next chunk
+        end = len(text)
+        while end > 0 and text[end - 1] > u'\x7f':
+            end -= 1
+        end = max(end - 1, 0)
+
+        yield text[:end]
+        pending = text[end:]
+
+    yield pending + decoder.decode('', final=True)
+
+
+def _encode_nfc(text):
+    """Return UTF-8 of a Unicode chunk, normalizing non-ASCII ones only."""
+    try:
+        return text.encode('ascii')
+    except UnicodeEncodeError:
+        return _normalize(text).encode('utf-8')
+
+
 def _decode(str_list, encoding):
     """Convert strings to Unicode using a given encoding."""
     decode = lambda text: str2unicode(text, encoding)
@@ -52,7 +52,7 @@ class ScriptWrapper(object):
         self.shell = _get_shell()
 
     def xlsh(self):
-        """Call xlsh.py for microplates in separate worksheets."""
+        """Run the pipeline for microplates in separate worksheets."""
 
         cmd_builder = self._get_builder()
         cmd_builder.xlsh()
@@ -60,7 +60,7 @@ class ScriptWrapper(object):
         self._execute(cmd_builder)
 
     def xlsv(self):
-        """Call xlsv.py for microplates in a single worksheet."""
+        """Run the pipeline for microplates in a single worksheet."""
 
         cmd_builder = self._get_builder()
         cmd_builder.xlsv()
@@ -80,7 +80,7 @@ class ScriptWrapper(object):
                                      self.filename,
                                      self.genes)
 
-        cmd_builder.group().control().assemble()
+        cmd_builder.group().control()
 
         if self.genes is not None:
             cmd_builder.genes()
@@ -92,88 +92,81 @@ class ScriptWrapper(object):
 
 
 class CommandBuilder(object):
-    """Builder of a shell command according to platform-specific syntax."""
+    """Builder of a pipeline.py command according to platform-specific syntax.
+
+    All stages run in a single process rather than a chain of scripts
+    connected with pipes, which would each re-parse the intermediate JSON.
+    """
 
     def __init__(self, shell, iterations, filename, genes):
         self.shell = shell
         self.iterations = iterations
         self.filename = filename
         self.genes_def = genes
-        self.command = []
+        self.command = ['pipeline.py']
 
     def __str__(self):
         return ' '.join(self.command)
 
     def group(self):
-        """Generate group.py script invocation, e.g.
-           $ group.py "file1" "file2" | group.py "file3" | ...
+        """Generate files of each iteration, e.g.
+           $ pipeline.py --iteration "file1" "file2" --iteration "file3" ...
         """
 
         for iteration in self.iterations:
-            self.command.append('group.py')
+            self.command.append('--iteration')
             for filename in iteration['files']:
                 self.command.append(self.shell.quote(filename))
-            self.command.append('|')
 
         return self
 
     def control(self):
-        """Generate control.py script invocation, e.g.
-           $ ... | control.py "file1" - "file3" | ...
+        """Generate control wells of each iteration, e.g.
+           $ pipeline.py ... --control "file1" --control - ...
         """
 
-        control = ['control.py']
         for iteration in self.iterations:
 
             filename = iteration['control'].get()
 
+            self.command.append('--control')
+
             if filename:
-                control.append(self.shell.quote(filename))
+                self.command.append(self.shell.quote(filename))
             else:
-                control.append('-')
-
-        self.command.extend(control)
-        self.command.append('|')
-
-        return self
+                self.command.append('-')
 
-    def assemble(self):
-        """Generate assemble.py script invocation."""
-        self.command.append('assemble.py')
         return self
 
     def genes(self):
-        """Generate genes.py script invocation, e.g.
-           $ ... | genes.py "file" | ...
+        """Generate genes definition, e.g.
+           $ pipeline.py ... --genes "file" ...
         """
 
         tmp = TempFile()
         tmp.write(self.genes_def)
 
-        self.command.append('|')
-        self.command.append('genes.py')
+        self.command.append('--genes')
         self.command.append(self.shell.quote(tmp.name()))
 
         return self
 
     def redirect(self):
-        """Keep intermediate JSON by redirecting assemble.py to a file."""
+        """Keep intermediate JSON in a file next to the output."""
         json_filename = self.shell.quote(self.filename[:-4] + '.json')
-        self.command.append(r'> %s && %s %s' % (json_filename,
-                                                self.shell.cat,
-                                                json_filename))
+        self.command.append('--json %s' % json_filename)
         return self
 
     def xlsh(self):
-        """Generate xlsh.py script invocation (horizontal layout)."""
-        return self._xls_script('xlsh.py')
+        """Generate output with the horizontal layout."""
+        return self._xls_output('horizontal')
 
     def xlsv(self):
-        """Generate xlsh.py script invocation (vertical layout)."""
-        return self._xls_script('xlsv.py')
+        """Generate output with the vertical layout."""
+        return self._xls_output('vertical')
 
-    def _xls_script(self, name):
-        self.command.append('| ' + name)
+    def _xls_output(self, layout):
+        self.command.append('--layout %s' % layout)
         self.command.append(r'%s -f' % self.shell.quote(self.filename))
         return self
 
@@ -183,7 +176,6 @@ class WindowsShell(object):
 
     def __init__(self):
         self.template = r'start cmd /c "%s"'
-        self.cat = 'type'
 
     def quote(self, filename):
         """Escape filename with Windows-style quotation marks."""
@@ -195,7 +187,6 @@ class UnixShell(object):
 
     def __init__(self):
         self.template = r'xterm -e "%s && sleep 5s" &'
-        self.cat = 'cat'
 
     def quote(self, filename):
         """Escape filename with Unix-style quotation marks."""
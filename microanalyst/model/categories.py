@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Classification of microplate wells into mutually exclusive categories.
+
+Categories are computed for all wells at once and stored in an int8 array
+of the same shape as the values, which makes per-well lookups cheap:
+>>> from microanalyst.model import categories
+>>> array4d = categories.classify(model.array4d, model.control_mask.values)
+>>> array4d[0, 0, 0, 0] == categories.STARVED
+True
+"""
+
+import numpy
+
+from microanalyst.model import thresholds
+
+
+NORMAL = 0
+STARVED = 1
+INFECTED = 2
+CONTROL = 3
+VIOLATED = 4
+MISSING = 5
+
+
+def classify(values, control_mask, predicates=None):
+    """Return an int8 array of well categories or None.
+
+    Parameters:
+    values: float array with NaN denoting missing wells
+    control_mask: boolean array of the same shape
+    predicates: tuple (is_starved, is_infected, is_violated), optional
+    """
+
+    if values is None:
+        return None
+
+    if predicates is None:
+        predicates = thresholds.default()
+
+    is_starved, is_infected, is_violated = predicates
+
+    result = numpy.empty(values.shape, dtype=numpy.int8)
+    result.fill(NORMAL)
+
+    with numpy.errstate(invalid='ignore'):
+        result[_evaluate(is_infected, values)] = INFECTED
+        result[_evaluate(is_starved, values)] = STARVED
+        if control_mask is not None:
+            result[control_mask] = CONTROL
+            result[control_mask & _evaluate(is_violated, values)] = VIOLATED
+
+    result[numpy.isnan(values)] = MISSING
+
+    return result
+
+
+def _evaluate(expression, values):
+    """Return boolean array of the expression applied to all values."""
+    return numpy.asarray(expression.apply(values), dtype=numpy.bool_)
@@ -27,6 +27,7 @@ Helper functions used across the model.
 """
 
 import sys
+import math
 import numpy
 
 from microanalyst.model.spreadsheets import Spreadsheets
@@ -57,31 +58,78 @@ def is_sequence(obj):
 
 
 def get_array4d(json_data, microplate_names):
-    """Return well values as numpy' 4d array.
+    """Return well values as numpy' 4d array of floats.
 
        (iteration x spreadsheet x microplate x well)
+
+    Wells of missing microplates, including microplates with no values and
+    spreadsheets padding shorter iterations, are filled with NaN. JSON data
+    is left intact.
     """
 
     if len(json_data[u'iterations']) > 0:
 
-        pad_missing_spreadsheets(json_data)
+        num_spreadsheets = max(len(x[u'spreadsheets'])
+                               for x in json_data[u'iterations'])
 
-        iterations = []
-        for iteration in json_data[u'iterations']:
-            spreadsheets = []
-            for spreadsheet in iteration[u'spreadsheets']:
+        shape = (len(json_data[u'iterations']),
+                 num_spreadsheets,
+                 len(microplate_names),
+                 96)
+
+        array4d = numpy.empty(shape, dtype=numpy.float64)
+        array4d.fill(numpy.nan)
+
+        for i, iteration in enumerate(json_data[u'iterations']):
+            for j, spreadsheet in enumerate(iteration[u'spreadsheets']):
                 spreadsheet_microplates = spreadsheet[u'microplates']
-                microplates = []
-                for microplate_name in microplate_names:
+                for k, microplate_name in enumerate(microplate_names):
                     if microplate_name in spreadsheet_microplates:
                         microplate = spreadsheet_microplates[microplate_name]
-                        microplates.append(microplate[u'values'])
-                    else:
-                        microplates.append([None]*96)
-                spreadsheets.append(microplates)
-            iterations.append(spreadsheets)
+                        if len(microplate[u'values']) > 0:
+                            array4d[i, j, k] = microplate[u'values']
+
+        return array4d
+
+
+def to_list(values):
+    """Return a list of floats with NaN replaced by None."""
+    return [None if math.isnan(x) else x for x in values.tolist()]
+
+
+def copy_containers(json_data):
+    """Return a copy of JSON data sharing only the microplate values.
+
+    Iterations, spreadsheets and microplates are shallow-copied so that
+    they can be padded or annotated without affecting the original,
+    whereas lists of values and custom annotations are shared with it,
+    which is considerably faster than a deep copy.
+    """
+
+    result = dict(json_data)
+
+    if u'iterations' in json_data:
+        result[u'iterations'] = []
+        for iteration in json_data[u'iterations']:
+            iteration = dict(iteration)
+            iteration[u'spreadsheets'] = [
+                _copy_spreadsheet(x) for x in iteration[u'spreadsheets']]
+            result[u'iterations'].append(iteration)
+
+    return result
 
-        return numpy.array(iterations)
+
+def _copy_spreadsheet(spreadsheet):
+    """Return a copy of a spreadsheet with copies of its microplates."""
+
+    result = dict(spreadsheet)
+
+    if u'microplates' in spreadsheet:
+        result[u'microplates'] = dict(
+            (name, dict(microplate))
+            for name, microplate in spreadsheet[u'microplates'].iteritems())
+
+    return result
 
 
 def pad_missing_spreadsheets(json_data):
@@ -31,17 +31,39 @@ import numpy
 from microanalyst.model import welladdr, spreadsheets
 from microanalyst.model.commons import slice_or_index
 
+_WELLS = {x: i for i, x in enumerate(welladdr.names())}
 
-class ControlMask(object):
-    """Function object and a collection API over numpy array."""
 
-    def __init__(self, json_data, microplate_names):
-        self._mask = _process(json_data, microplate_names)
-        self._microplate_names = microplate_names
+class ControlMask(object):
+    """Function object and a collection API over numpy array.
+
+    Control wells are defined per iteration and only occasionally extended
+    by individual spreadsheets, hence the mask is kept as a stack of
+    distinct (microplate x well) layers and an (iteration x spreadsheet)
+    array of indices into that stack. Values is a read-only view
+    broadcasting each iteration's layer over its spreadsheets, unless a
+    single spreadsheet overrides control wells. Then the full 4d array
+    has to be built, which takes one byte per well of the experiment.
+    Either way it is built once on first access and cached.
+
+    Calls for a single spreadsheet only look up its layer, whereas calls
+    spanning several spreadsheets return a view of the cached values.
+    """
+
+    def __init__(self, json_data, microplate_names, mask=None):
+        if mask is None:
+            self._layers, self._layer_index = _process(json_data,
+                                                       microplate_names)
+        else:
+            self._layers, self._layer_index = None, None
+        self._mask = mask
+        self._indexof = {x: i for i, x in enumerate(microplate_names)}
 
     @property
     def values(self):
         """Numpy array of boolean values."""
+        if self._mask is None and self._layers is not None:
+            self._mask = _expand(self._layers, self._layer_index)
         return self._mask
 
     def __call__(self,
@@ -53,54 +75,113 @@ class ControlMask(object):
 
         if microplate is not None:
             if not isinstance(microplate, int):
-                microplate = self._microplate_names.index(microplate)
+                try:
+                    microplate = self._indexof[microplate]
+                except KeyError:
+                    raise ValueError('Unknown microplate "%s"' % microplate)
 
         x = slice_or_index(iteration)
         y = slice_or_index(spreadsheet)
         z = slice_or_index(microplate)
         w = slice_or_index(welladdr.indexof(well))
 
-        return self._mask[x, y, z, w]
+        if self._layers is not None:
+            if isinstance(x, int) and isinstance(y, int):
+                return self._layers[self._layer_index[x, y], z, w]
+
+        return self.values[x, y, z, w]
 
     def __getitem__(self, x):
-        return self._mask[x]
+        return self.values[x]
 
 
-def get_mask(json_data, microplate_names):
-    """Return wrapper for numpy array."""
-    return ControlMask(json_data, microplate_names)
+def get_mask(json_data, microplate_names, mask=None):
+    """Return wrapper for numpy array, optionally a precomputed one."""
+    return ControlMask(json_data, microplate_names, mask)
 
 
 def _process(json_data, microplate_names):
-    """Return a 4d boolean numpy array or None."""
+    """Return a tuple (layers, layer_index) or (None, None).
+
+    Layers are a 3d boolean array (layer x microplate x well), and the
+    layer index is a 2d integer array (iteration x spreadsheet).
+    """
+
+    if len(json_data[u'iterations']) == 0:
+        return None, None
+
+    assert spreadsheets.Spreadsheets(json_data).has_equal_number()
+
+    indexof = {x: i for i, x in enumerate(microplate_names)}
+    shape = (len(microplate_names), 96)
+    parsed = {}
+
+    layers, layer_index = [], []
+    for iteration in json_data[u'iterations']:
+
+        base = len(layers)
+        layers.append(_scatter(numpy.zeros(shape, dtype=numpy.bool_),
+                               indexof,
+                               iteration,
+                               parsed))
+
+        indices = []
+        for spreadsheet in iteration[u'spreadsheets']:
+            if spreadsheet.get(u'control'):
+                indices.append(len(layers))
+                layers.append(_scatter(layers[base].copy(),
+                                       indexof,
+                                       spreadsheet,
+                                       parsed))
+            else:
+                indices.append(base)
+
+        layer_index.append(indices)
+
+    return numpy.array(layers), numpy.array(layer_index, dtype=numpy.intp)
+
+
+def _expand(layers, layer_index):
+    """Return a 4d boolean array, possibly a broadcast view."""
+
+    num_iterations, num_spreadsheets = layer_index.shape
+
+    if num_spreadsheets > 0:
+        if (layer_index == layer_index[:, :1]).all():
+            shape = (num_iterations, num_spreadsheets) + layers.shape[1:]
+            base = layers[layer_index[:, 0]][:, numpy.newaxis]
+            return numpy.broadcast_to(base, shape)
+
+    return layers[layer_index]
 
-    if len(json_data[u'iterations']) > 0:
 
-        assert spreadsheets.Spreadsheets(json_data).has_equal_number()
+def _scatter(layer, indexof, source, parsed):
+    """Set flags for control wells of a source in a 2d layer in place.
 
-        mask_iterations = []
-        for iteration in json_data[u'iterations']:
-            mask_spreadsheets = []
-            for spreadsheet in iteration[u'spreadsheets']:
-                mask_microplates = []
-                for microplate_name in microplate_names:
+    Lists of well addresses are parsed into index arrays once and memoized
+    in the parsed dict, since the same control wells tend to repeat across
+    microplates and iterations.
+    """
 
-                    mask = [False] * 96
+    z, w, counts = [], [], []
+    for microplate_name, wells in (source.get(u'control') or {}).iteritems():
+        if microplate_name in indexof:
 
-                    _update_mask(mask, microplate_name, iteration)
-                    _update_mask(mask, microplate_name, spreadsheet)
+            key = tuple(wells)
+            if key not in parsed:
+                parsed[key] = numpy.array([_parse_well(x) for x in key],
+                                          dtype=numpy.intp)
 
-                    mask_microplates.append(mask)
+            z.append(indexof[microplate_name])
+            w.append(parsed[key])
+            counts.append(len(key))
 
-                mask_spreadsheets.append(mask_microplates)
-            mask_iterations.append(mask_spreadsheets)
+    if z:
+        layer[numpy.repeat(z, counts), numpy.concatenate(w)] = True
 
-        return numpy.array(mask_iterations)
+    return layer
 
 
-def _update_mask(mask, microplate_name, source):
-    """Set flag for wells listed as control ones."""
-    if u'control' in source:
-        if microplate_name in source[u'control']:
-            for well in source[u'control'][microplate_name]:
-                mask[welladdr.indexof(well)] = True
+def _parse_well(well):
+    """Return row-major index of a well address or index."""
+    return _WELLS[well] if well in _WELLS else welladdr.indexof(well)
@@ -27,9 +27,12 @@ Lambda function built dynamically from string.
 """
 
 import re
+import ast
 import keyword
 import collections
 
+import numpy
+
 
 class Expression(object):
     """Python's anonymous function wrapper.
@@ -62,6 +65,16 @@ class Expression(object):
     Enforce parameter order with explicit "params":
     >>> pp = Expression('(x/z, y/z)', params=('x', 'y', 'z'))
     >>> x, y = pp(10, 25, 5)
+
+    Evaluate element-wise on numpy arrays with apply():
+    >>> is_valid = Expression('0 <= x < 1 and not x == 0.5')
+    >>> print is_valid.apply(numpy.array([-1, 0, 0.5, 0.7]))
+    [False  True False  True]
+
+    Boolean operators, chained comparisons and conditional expressions are
+    translated to their numpy counterparts, which always evaluate all of
+    the operands. Other than that only arithmetic, function calls, names
+    and numbers are allowed in array expressions.
     """
 
     def __init__(self, expr, scope=None, params=None):
@@ -74,6 +87,9 @@ class Expression(object):
         """
         self.expr = expr
         self.func = eval(_parse(expr, scope, params), scope)
+        self.scope = scope
+        self.params = params
+        self.array_func = None
 
     def __str__(self):
         return self.expr
@@ -81,6 +97,18 @@ class Expression(object):
     def __call__(self, *args):
         return self.func(*args)
 
+    def apply(self, *args):
+        """Evaluate the expression element-wise on numpy arrays.
+
+        The array function is compiled on first use, raising ValueError
+        if the expression contains unsupported syntax.
+        """
+        if self.array_func is None:
+            self.array_func = _compile_array(self.expr,
+                                             self.scope,
+                                             self.params)
+        return self.array_func(*args)
+
 
 def _parse(expr, scope, params):
     """Return string representation of a lambda function."""
@@ -105,3 +133,114 @@ def _extract_variables(expr, scope):
                     variables[item] = None
 
     return variables.keys()
+
+
+def _compile_array(expr, scope, params):
+    """Return a function of numpy arrays built from the expression's AST."""
+
+    if not params:
+        params = _extract_variables(expr, scope)
+
+    tree = ast.parse(expr.strip(), mode='eval')
+
+    _validate(expr, tree)
+
+    body = _ArrayTransformer().visit(tree.body)
+
+    # outer function binds numpy helpers without polluting the scope
+    inner = ast.Lambda(args=_arguments(params), body=body)
+    outer = ast.Lambda(args=_arguments(_ARRAY_HELPERS.keys()), body=inner)
+
+    code = compile(ast.fix_missing_locations(ast.Expression(body=outer)),
+                   '<expression>',
+                   'eval')
+
+    return eval(code, scope)(*_ARRAY_HELPERS.values())
+
+
+def _arguments(names):
+    """Return AST node with the names of positional arguments."""
+    return ast.arguments(args=[ast.Name(id=x, ctx=ast.Param()) for x in names],
+                         vararg=None,
+                         kwarg=None,
+                         defaults=[])
+
+
+def _validate(expr, tree):
+    """Raise ValueError if the AST cannot be evaluated on arrays."""
+
+    def fail(what):
+        message = 'Unsupported %s in array expression: %s'
+        raise ValueError(message % (what, expr))
+
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            fail('syntax "%s"' % type(node).__name__)
+        if isinstance(node, ast.Call):
+            if node.keywords or node.starargs or node.kwargs:
+                fail('arguments')
+            if not isinstance(node.func, ast.Name):
+                fail('function')
+
+
+class _ArrayTransformer(ast.NodeTransformer):
+    """Replace Python constructs which don't broadcast with numpy calls."""
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        name = '_and_' if isinstance(node.op, ast.And) else '_or_'
+        return reduce(lambda x, y: _call(name, x, y), node.values)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return _call('_not_', node.operand)
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        operands = [node.left] + node.comparators
+        pairs = [ast.Compare(left=operands[i],
+                             ops=[op],
+                             comparators=[operands[i + 1]])
+                 for i, op in enumerate(node.ops)]
+        return reduce(lambda x, y: _call('_and_', x, y), pairs)
+
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        return _call('_where_', node.test, node.body, node.orelse)
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        node.func = _call('_array_', node.func)
+        return node
+
+
+def _call(name, *args):
+    """Return AST node calling a function with positional arguments."""
+    return ast.Call(func=ast.Name(id=name, ctx=ast.Load()),
+                    args=list(args),
+                    keywords=[],
+                    starargs=None,
+                    kwargs=None)
+
+
+def _array(func):
+    """Return array counterpart of a function called from an expression."""
+    return func.apply if isinstance(func, Expression) else func
+
+
+_ARRAY_HELPERS = collections.OrderedDict([
+    ('_and_', numpy.logical_and),
+    ('_or_', numpy.logical_or),
+    ('_not_', numpy.logical_not),
+    ('_where_', numpy.where),
+    ('_array_', _array)
+])
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.BinOp, ast.UnaryOp, ast.Compare,
+    ast.IfExp, ast.Call, ast.Name, ast.Num, ast.Tuple, ast.Load,
+    ast.boolop, ast.operator, ast.unaryop,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE
+)
@@ -26,7 +26,9 @@ import sys
 import numpy
 
 from microanalyst.model import welladdr
-from microanalyst.model.commons import flatten, slice_or_index
+
+_WELLS = range(96)
+_NO_LOCATIONS = numpy.empty(0, dtype=numpy.int32)
 
 
 class Gene(str):
@@ -61,111 +63,206 @@ class Gene(str):
 
 
 class Genes(object):
-    """Helper class for handling genes' names."""
+    """Helper class for handling genes' names.
 
-    def __init__(self, model, microplate_names):
+    Each distinct gene name is stored once in a sorted string table, and
+    annotated wells refer to it through a (microplate x well) array of
+    indices, where -1 marks a well without a gene. Gene objects are only
+    created when returned to the caller.
 
-        if not u'genes' in model.json_data:
-            self.genes_matrix = None
-        else:
+    Lookup tables of flat locations (microplate index * 96 + well index)
+    are built once when the model is loaded:
 
-            genes_json = model.json_data[u'genes']
+      - microplate -> genes sorted by name
+      - well index -> genes across all microplates sorted by name
+      - lowercase gene name -> first instance of the gene
+    """
 
-            self.microplate_names = microplate_names
-            self.microplate_names_with_genes = sorted(set(genes_json))
-            self.indexof = {
-                x: i for i, x in enumerate(self.microplate_names_with_genes)
-            }
+    def __init__(self, model, microplate_names):
+
+        self.model = model
+        self.microplate_names = microplate_names
+        self.defined = u'genes' in model.json_data
 
-            self.genes_matrix = self._process(model, genes_json)
+        self.names = []
+        self.microplates = []
+        self.indexof = {}
+        self.name_ids = numpy.empty((0, 96), dtype=numpy.int16)
 
-            self.genes = {}
-            for gene in self.genes_matrix.ravel():
-                if gene:
-                    gene_name = gene.name.lower()
-                    if gene_name in self.genes:
-                        self.genes[gene_name].append(gene)
-                    else:
-                        self.genes[gene_name] = [gene]
+        self.by_microplate = {}
+        self.by_well = {}
+        self.by_name = {}
+        self.all_genes = _NO_LOCATIONS
+        self.used_genes = _NO_LOCATIONS
 
-            self._check_duplicates()
+        if self.defined:
+            self._process(model.json_data[u'genes'])
 
     def get_by_name(self, name):
         """Get gene by its name (case insensitive)."""
 
-        name = name.lower()
+        location = self.by_name.get(name.lower())
 
-        if name in self.genes:
-            return self.genes[name][0]
+        if location is not None:
+            return self._view(location)
         else:
             return None
 
+    def locate(self, names):
+        """Return microplates' names and well indices of genes by name.
+
+        Gene objects keep their own location. Other names are case
+        insensitive and resolve to the first instance of a gene, just like
+        get_by_name().
+        """
+
+        microplates, wells = [], []
+        for name in names:
+
+            if isinstance(name, Gene):
+                microplates.append(name.microplate_name)
+                wells.append(welladdr.str2int(name.well_name))
+                continue
+
+            location = self.by_name.get(name.lower())
+
+            if location is None:
+                raise KeyError('Unknown gene "%s"' % name)
+
+            microplate, well = divmod(location, 96)
+            microplates.append(self.microplates[microplate])
+            wells.append(well)
+
+        return microplates, wells
+
     def get(self, well, microplate):
         """Return a sorted list of genes' names."""
 
-        if self.genes_matrix is None:
+        if not self.defined:
             return []
 
-        if microplate is None:
-            x = slice_or_index(None)
-        else:
-            if microplate in self.microplate_names_with_genes:
-                x = slice_or_index(self.indexof[microplate])
-            else:
+        if microplate is not None:
+            if microplate not in self.by_microplate:
                 if microplate in self.microplate_names:
                     return []
                 else:
                     raise KeyError('Unknown microplate "%s"' % microplate)
 
-        y = slice_or_index(welladdr.indexof(well))
+        if well is None:
+            if microplate is None:
+                return self._views(self.all_genes)
+            else:
+                return self._views(self.by_microplate[microplate])
 
-        if not (well is None or microplate is None):
-            return flatten([self.genes_matrix[x, y]])
+        index = _WELLS[welladdr.indexof(well)]
+
+        if microplate is None:
+            return self._views(self.by_well[index])
         else:
-            return sorted(set(flatten(self.genes_matrix[x, y])))
+            location = self.indexof[microplate] * 96 + index
+            if self.name_ids.flat[location] < 0:
+                return []
+            else:
+                return [self._view(location)]
 
     def get_used(self):
         """Return a sorted list of genes' names used in the experiment."""
+        return self._views(self.used_genes)
 
-        if self.genes_matrix is None:
-            return []
+    def _view(self, location):
+        """Return a Gene object for a flat location."""
 
-        genes = []
-        for name in self.microplate_names:
-            genes.extend(self.get(microplate=name, well=None))
+        microplate, well = divmod(int(location), 96)
 
-        return sorted(set(genes))
+        return Gene(self.model,
+                    self.names[self.name_ids[microplate, well]],
+                    welladdr.int2str(well),
+                    self.microplates[microplate])
 
-    def _process(self, model, genes_json):
-        """Return a 2d array (microplate x well) of gene names."""
+    def _views(self, locations):
+        """Return a list of Gene objects for flat locations."""
+        return [self._view(x) for x in locations]
 
-        microplates = []
-        for microplate in self.microplate_names_with_genes:
-            wells = []
-            for well in welladdr.names():
-                if well in genes_json[microplate]:
-                    name = genes_json[microplate][well]
-                    wells.append(Gene(model, name, well, microplate))
-                else:
-                    wells.append(None)
-            microplates.append(wells)
+    def _process(self, genes_json):
+        """Build string tables, index arrays and lookup tables."""
+
+        self.microplates = sorted(genes_json)
+        self.indexof = {x: i for i, x in enumerate(self.microplates)}
+
+        self.names = sorted(set(
+            name for wells in genes_json.itervalues()
+            for name in wells.itervalues()
+        ))
+
+        name_ids = {x: i for i, x in enumerate(self.names)}
+
+        dtype = numpy.int16 if len(self.names) < 2**15 else numpy.int32
+        self.name_ids = numpy.empty((len(self.microplates), 96), dtype=dtype)
+        self.name_ids.fill(-1)
+
+        for i, microplate in enumerate(self.microplates):
+            wells = genes_json[microplate]
+            for j, well in enumerate(welladdr.names()):
+                if well in wells:
+                    self.name_ids[i, j] = name_ids[wells[well]]
+
+        locations = numpy.flatnonzero(self.name_ids.ravel() >= 0)
+        locations = locations.astype(numpy.int32)
+
+        self.all_genes = self._unique_sorted(locations)
 
-        return numpy.array(microplates)
+        bounds = numpy.searchsorted(
+            locations, numpy.arange(len(self.microplates) + 1) * 96)
 
-    def _check_duplicates(self):
-        """Warn about duplicate instances of genes on microplates."""
+        for i, microplate in enumerate(self.microplates):
+            self.by_microplate[microplate] = self._unique_sorted(
+                locations[bounds[i]:bounds[i + 1]])
 
-        duplicates = set()
-        for name in self.genes:
-            if len(self.genes[name]) > 1:
-                duplicates.add(name)
+        wells = locations % 96
+        for index in _WELLS:
+            self.by_well[index] = self._unique_sorted(
+                locations[wells == index])
 
-        for name in sorted(duplicates):
+        used = [self.indexof[x] for x in self.microplate_names
+                if x in self.indexof]
+        self.used_genes = self._unique_sorted(
+            locations[numpy.in1d(locations // 96, used)])
 
-            original_name = self.genes[name][0].name
-            instances = ['("%s"/%s)' % (
-                x.microplate_name, x.well_name) for x in self.genes[name]
+        self._index_names(locations)
+
+    def _unique_sorted(self, locations):
+        """Return first instance of each gene in locations sorted by name."""
+
+        name_ids = self.name_ids.ravel()[locations]
+        unique, first = numpy.unique(name_ids, return_index=True)
+
+        return locations[first]
+
+    def _index_names(self, locations):
+        """Map lowercase names to first instances and warn about duplicates."""
+
+        lowercase = [x.lower() for x in self.names]
+        lowercase_names = sorted(set(lowercase))
+        indexof = {x: i for i, x in enumerate(lowercase_names)}
+        lowercase_ids = numpy.array([indexof[x] for x in lowercase],
+                                    dtype=numpy.int32)
+
+        ids = lowercase_ids[self.name_ids.ravel()[locations]]
+        unique, first, counts = numpy.unique(ids,
+                                             return_index=True,
+                                             return_counts=True)
+
+        self.by_name = dict(zip([lowercase_names[x] for x in unique],
+                                locations[first].tolist()))
+
+        for i in unique[counts > 1]:
+
+            instances = [self._view(x) for x in locations[ids == i]]
+            addresses = ['("%s"/%s)' % (
+                x.microplate_name, x.well_name) for x in instances
             ]
 
             message = 'Warning: duplicate gene "%s" at %s'
-            print >> sys.stderr, message % (original_name, ', '.join(instances))
+            print >> sys.stderr, message % (instances[0].name,
+                                            ', '.join(addresses))
+
@@ -30,10 +30,29 @@ class Microplates(object):
 
     def __init__(self, json_data):
         self.microplates = _process(json_data)
+        self.names = {}
+        self.indexof = {x: i for i, x in enumerate(self.get(None, None))}
 
     def get(self, iteration, spreadsheet):
         """Return a sorted list of microplates' names."""
 
+        key = (iteration, spreadsheet)
+
+        if key not in self.names:
+            self.names[key] = tuple(self._get(iteration, spreadsheet))
+
+        return list(self.names[key])
+
+    def index(self, name):
+        """Return position of a microplate among all sorted names."""
+        try:
+            return self.indexof[name]
+        except KeyError:
+            raise ValueError('Unknown microplate "%s"' % name)
+
+    def _get(self, iteration, spreadsheet):
+        """Return a sorted list of microplates' names without caching."""
+
         if iteration is not None:
             if spreadsheet is not None:
                 microplate_names = self.microplates[iteration][spreadsheet]
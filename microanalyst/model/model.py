@@ -32,37 +32,98 @@ Sample usage:
 [[ 0.74559999  0.69270003  0.71609998]
  [ 0.75940001  0.71679997  0.70590001]
  [ 0.75809997  0.70069999  0.73320001]]
+
+JSON strings, e.g. read from a pipe, can be parsed straight into a model
+without holding microplate values as Python lists:
+>>> model = microanalyst.model.Model.loads(sys.stdin.read())
+
+Models can be saved in a native binary format which loads much faster:
+>>> model.save(r'experiment')
+>>> model = microanalyst.model.Model.open(r'experiment')
 """
 
-import copy
-import json
+import numpy
 
 from microanalyst.model import welladdr
 from microanalyst.model import control
+from microanalyst.model import categories
+from microanalyst.model import storage
+from microanalyst.model import streaming
 from microanalyst.model.filenames import Filenames
 from microanalyst.model.genes import Genes
 from microanalyst.model.microplates import Microplates
 from microanalyst.model.commons import get_array4d, slice_or_index
+from microanalyst.model.commons import copy_containers
+from microanalyst.model.commons import pad_missing_spreadsheets
 
 
 class Model(object):
     """High level interface for querying data model stored in JSON."""
 
     def __init__(self, json_data):
+        # prevent external side-effects without copying microplate values
+        self._initialize(copy_containers(json_data))
+
+    def _initialize(self, json_data, array4d=None, control_mask=None):
+        """Build model from JSON or from precomputed arrays.
 
-        self._data = copy.deepcopy(json_data) # prevent external side-effects
+        When array4d and control_mask are given, microplate values in
+        json_data are ignored and may be omitted altogether. Iterations
+        of json_data get padded with stubs for missing spreadsheets, hence
+        they must not be shared with the caller.
+        """
+
+        self._data = json_data
         self._filenames = Filenames(self.json_data)
         self._microplates = Microplates(self.json_data)
 
         microplate_names = self.microplate_names()
 
         self._genes = Genes(self, microplate_names)
-        self._array4d = get_array4d(self.json_data, microplate_names)
-        self._control_mask = control.get_mask(self.json_data, microplate_names)
+
+        if array4d is None:
+            self._array4d = get_array4d(self.json_data, microplate_names)
+        else:
+            self._array4d = array4d
+
+        if len(self.json_data[u'iterations']) > 0:
+            pad_missing_spreadsheets(self.json_data)
+
+        self._control_mask = control.get_mask(self.json_data,
+                                              microplate_names,
+                                              control_mask)
+
+        self._categories = None
 
     def __repr__(self):
         return '<microanalyst.model.Model object at %s>' % hex(id(self))
 
+    @classmethod
+    def open(cls, path, mmap=False):
+        """Return model loaded from a directory created with save().
+
+        With mmap=True values and control mask are memory-mapped from disk
+        and only the pages touched by queries are read into memory.
+        """
+        model = cls.__new__(cls)
+        model._initialize(*storage.load(path, mmap))
+        return model
+
+    @classmethod
+    def loads(cls, text):
+        """Return model parsed from a JSON string.
+
+        Values are copied into the array as soon as each microplate is
+        parsed, hence json_data of the model has no microplate values.
+        """
+        model = cls.__new__(cls)
+        model._initialize(*streaming.parse(text))
+        return model
+
+    def save(self, path):
+        """Write model to a directory in the native binary format."""
+        storage.save(self, path)
+
     @property
     def json_data(self):
         """Dictionary parsed from the JSON file."""
@@ -77,6 +138,7 @@ class Model(object):
     def array4d(self, value):
         """Float array: iteration x spreadsheet x microplate x well."""
         self._array4d = value
+        self._categories = None
 
     @property
     def control_mask(self):
@@ -137,19 +199,90 @@ class Model(object):
         if self.array4d is None:
             return None
 
+        return self.array4d[self._get_index(iteration,
+                                            spreadsheet,
+                                            microplate,
+                                            well)]
+
+    def values_for_genes(self, names, iteration=None, spreadsheet=None):
+        """Return values of many genes gathered into a single array.
+
+        The first axis follows the order of names and each entry equals
+        gene.values() for the same iteration and spreadsheet:
+           >>> model.values_for_genes(['foo', 'bar']).shape
+           (2, 3, 3)
+        """
+
+        if self.array4d is None:
+            return None
+
+        microplates, wells = self._genes.locate(names)
+
+        z = numpy.array([self._microplates.index(x) for x in microplates],
+                        dtype=numpy.intp)
+        w = numpy.array(wells, dtype=numpy.intp)
+
+        x = slice_or_index(iteration)
+        y = slice_or_index(spreadsheet)
+
+        return self.array4d.transpose(2, 3, 0, 1)[z, w][:, x, y]
+
+    def gene_matrix(self, iteration=None, spreadsheet=None):
+        """Return a tuple (genes, values) for genes used in the experiment.
+           >>> genes, values = model.gene_matrix()
+           >>> values[genes.index('foo')]
+           [[ 0.7385      0.66869998  0.66420001]
+            [ 0.74629998  0.70660001  0.63870001]
+            [ 0.71689999  0.78380001  0.72259998]]
+        """
+        genes = self.genes_used()
+        return genes, self.values_for_genes(genes, iteration, spreadsheet)
+
+    def categories(self,
+                   iteration=None,
+                   spreadsheet=None,
+                   microplate=None,
+                   well=None):
+        """Return subarray of well categories or a scalar.
+
+        Categories are computed with default thresholds on first use:
+           >>> from microanalyst.model import categories
+           >>> model.categories(0, 0, '001', 'A1') == categories.STARVED
+           True
+        """
+
+        if self.array4d is None:
+            return None
+
+        if self._categories is None:
+            self._categories = categories.classify(self.array4d,
+                                                   self.control_mask.values)
+
+        return self._categories[self._get_index(iteration,
+                                                spreadsheet,
+                                                microplate,
+                                                well)]
+
+    def _get_index(self, iteration, spreadsheet, microplate, well):
+        """Return a tuple for indexing 4d arrays of the model."""
+
         if microplate is not None:
             if not isinstance(microplate, int):
-                microplate = self.microplate_names().index(microplate)
+                microplate = self._microplates.index(microplate)
 
         x = slice_or_index(iteration)
         y = slice_or_index(spreadsheet)
         z = slice_or_index(microplate)
         w = slice_or_index(welladdr.indexof(well))
 
-        return self.array4d[x, y, z, w]
+        return x, y, z, w
 
 
 def from_file(filename):
-    """Return initialized instance of the Model."""
+    """Return initialized instance of the Model from JSON or a directory."""
+
+    if storage.is_container(filename):
+        return Model.open(filename)
+
     with open(filename) as file_handle:
-        return Model(json.load(file_handle))
+        return Model.loads(file_handle.read())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Native container format for the experiment data model.
+
+An experiment is kept in a directory with the following files:
+* values.npy - float array: iteration x spreadsheet x microplate x well
+* control.npy - boolean array of the same shape denoting control wells
+* model.json - the JSON data model stripped of microplate values
+
+Numpy arrays are loaded as they are, without going through Python lists,
+whereas the remaining JSON is small since it only retains metadata such as
+filenames, genes, timestamps or custom annotations. Wells of missing
+microplates are stored as NaN.
+
+Experiments larger than the available memory can be memory-mapped instead
+of being read as a whole.
+
+Sample usage:
+>>> import microanalyst.model
+>>> model = microanalyst.model.from_file('experiment.json')
+>>> model.save('experiment')
+>>> model = microanalyst.model.Model.open('experiment')
+>>> model = microanalyst.model.Model.open('experiment', mmap=True)
+"""
+
+import os
+import json
+
+import numpy
+
+from microanalyst.model.commons import to_list
+from microanalyst.model.spreadsheets import Spreadsheets
+
+
+FORMAT_VERSION = 1
+
+VALUES_FILENAME = 'values.npy'
+CONTROL_FILENAME = 'control.npy'
+METADATA_FILENAME = 'model.json'
+
+
+def save(model, dirname):
+    """Write model to a directory, which is created if necessary."""
+
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname)
+
+    metadata = {
+        u'format': FORMAT_VERSION,
+        u'model': strip_values(model.json_data)
+    }
+
+    with open(os.path.join(dirname, METADATA_FILENAME), 'w') as file_handle:
+        json.dump(metadata, file_handle, sort_keys=True)
+
+    for filename, array in ((VALUES_FILENAME, _get_values(model)),
+                            (CONTROL_FILENAME, _get_control_mask(model))):
+        path = os.path.join(dirname, filename)
+        if array is None:
+            if os.path.exists(path):
+                os.remove(path)
+        else:
+            if _is_mapped(array, path):
+                # file would be truncated while still being mapped
+                array = numpy.array(array)
+            numpy.save(path, array)
+
+
+def load(dirname, mmap=False):
+    """Return a tuple (json_data, array4d, control_mask) from a directory.
+
+    When mmap is True the arrays are memory-mapped rather than read into
+    memory, so that only the pages actually accessed are loaded from disk.
+    Changes made to such arrays are never written back to the files.
+    """
+
+    with open(os.path.join(dirname, METADATA_FILENAME)) as file_handle:
+        metadata = json.load(file_handle)
+
+    if metadata.get(u'format') != FORMAT_VERSION:
+        raise ValueError('Unsupported format of "%s"' % dirname)
+
+    mmap_mode = 'c' if mmap else None
+
+    return (metadata[u'model'],
+            _load_array(dirname, VALUES_FILENAME, mmap_mode),
+            _load_array(dirname, CONTROL_FILENAME, mmap_mode))
+
+
+def is_container(path):
+    """Check if a given path looks like an experiment directory."""
+    return os.path.isfile(os.path.join(path, METADATA_FILENAME))
+
+
+def strip_values(json_data):
+    """Return a copy of JSON data model without microplate values.
+
+    Stubs appended for missing spreadsheets are removed as well, since
+    they are recreated when the model gets loaded.
+    """
+
+    result = dict(json_data)
+    result[u'iterations'] = []
+
+    for iteration in json_data[u'iterations']:
+
+        spreadsheets = list(iteration[u'spreadsheets'])
+        while spreadsheets and spreadsheets[-1] == Spreadsheets.empty():
+            spreadsheets.pop()
+
+        iteration = dict(iteration)
+        iteration[u'spreadsheets'] = []
+
+        for spreadsheet in spreadsheets:
+
+            spreadsheet = dict(spreadsheet)
+            spreadsheet[u'microplates'] = {
+                name: {k: v for k, v in microplate.iteritems() if k != u'values'}
+                for name, microplate in spreadsheet[u'microplates'].iteritems()
+            }
+
+            iteration[u'spreadsheets'].append(spreadsheet)
+
+        result[u'iterations'].append(iteration)
+
+    return result
+
+
+def to_json(model):
+    """Return JSON data model with values taken from the model's array."""
+
+    json_data = strip_values(model.json_data)
+    microplate_names = model.microplate_names()
+
+    for i, iteration in enumerate(json_data[u'iterations']):
+        for j, spreadsheet in enumerate(iteration[u'spreadsheets']):
+            for name, microplate in spreadsheet[u'microplates'].iteritems():
+                z = microplate_names.index(name)
+                microplate[u'values'] = to_list(model.array4d[i, j, z])
+
+    return json_data
+
+
+def _get_values(model):
+    """Return float array of the model's values or None."""
+    if model.array4d is not None:
+        return numpy.asanyarray(model.array4d, dtype=numpy.float64)
+
+
+def _get_control_mask(model):
+    """Return boolean array of the model's control wells or None."""
+    if model.control_mask.values is not None:
+        return numpy.asanyarray(model.control_mask.values, dtype=numpy.bool_)
+
+
+def _is_mapped(array, path):
+    """Check if a given array is memory-mapped from the file at path."""
+    return isinstance(array, numpy.memmap) and \
+        array.filename == os.path.abspath(path)
+
+
+def _load_array(dirname, filename, mmap_mode=None):
+    """Return numpy array loaded from a file or None if missing."""
+    path = os.path.join(dirname, filename)
+    if os.path.exists(path):
+        return numpy.load(path, mmap_mode=mmap_mode)
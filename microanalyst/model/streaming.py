@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Parser of the JSON data model keeping microplate values out of Python lists.
+
+Parsing with plain json.loads() builds a Python float inside nested lists
+for every single well, which takes several times more memory than the
+values themselves. Here every object with a list of 96 numbers under the
+"values" key is intercepted by an object hook as soon as it has been
+parsed, its values are copied into preallocated blocks of a float array and
+the list is released right away. Only the metadata, such as filenames,
+genes, timestamps or custom annotations, is retained as Python objects.
+
+The hook cannot tell microplates from custom annotations which happen to
+look alike, since objects are decoded bottom-up. Once the whole document
+has been parsed, values found under iterations/spreadsheets/microplates
+are scattered into the 4d array block by block, whereas values intercepted
+anywhere else are turned back into the original lists. Only lists of
+floats and nulls are intercepted, so that they can be restored exactly.
+
+Sample usage:
+>>> import microanalyst.model
+>>> model = microanalyst.model.Model.loads(text)
+"""
+
+import json
+
+import numpy
+
+from microanalyst.model.commons import to_list
+from microanalyst.model.microplates import Microplates
+
+# number of microplates per block of values
+BLOCK_SIZE = 1024
+
+
+def parse(text, block_size=BLOCK_SIZE):
+    """Return a tuple (json_data, array4d) from a JSON string.
+
+    Microplates in json_data are stripped of their values, which end up in
+    array4d with wells of missing microplates filled with NaN.
+    """
+
+    blocks = _Blocks(block_size)
+    json_data = json.loads(text, object_hook=blocks.hook)
+
+    return json_data, _get_array4d(json_data, blocks)
+
+
+class _Row(int):
+    """Index of a row with values intercepted by the object hook."""
+
+
+class _Blocks(object):
+    """Growing list of preallocated float arrays: microplate x well."""
+
+    def __init__(self, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self.arrays = []
+        self.count = 0
+
+    def hook(self, obj):
+        """Replace values which look like a microplate's with a row index."""
+
+        values = obj.get(u'values')
+
+        if type(values) is list and len(values) == 96:
+            if not _is_container(obj):
+                row = self.append(values)
+                if row is not None:
+                    obj[u'values'] = row
+
+        return obj
+
+    def append(self, values):
+        """Copy values into the next row and return its index or None."""
+
+        if not _FLOAT_TYPES.issuperset(map(type, values)):
+            return None
+
+        row = self.count % self.block_size
+
+        if row == 0:
+            self.arrays.append(numpy.empty((self.block_size, 96)))
+
+        array = self.arrays[-1][row]
+        array[:] = values
+
+        # NaN literals could not be told apart from nulls when restoring
+        if numpy.isnan(array).sum() != values.count(None):
+            return None
+
+        self.count += 1
+
+        return _Row(self.count - 1)
+
+    def get(self, row):
+        """Return a row of values as a list with NaN replaced by None."""
+        return to_list(self.arrays[row // self.block_size][
+            row % self.block_size])
+
+
+_FLOAT_TYPES = frozenset([float, type(None)])
+
+
+def _is_container(obj):
+    """Check if a JSON object is one of the enclosing ones."""
+    return u'iterations' in obj or \
+           u'spreadsheets' in obj or \
+           u'microplates' in obj
+
+
+def _restore(obj, blocks):
+    """Put back lists of values intercepted outside of microplates."""
+
+    if isinstance(obj, dict):
+        items = obj.iteritems()
+    elif isinstance(obj, list):
+        items = enumerate(obj)
+    else:
+        return
+
+    for key, value in list(items):
+        if isinstance(value, _Row):
+            obj[key] = blocks.get(value)
+        else:
+            _restore(value, blocks)
+
+
+def _get_array4d(json_data, blocks):
+    """Return values in the 4d array, removing row indices from JSON."""
+
+    if len(json_data[u'iterations']) == 0:
+        _restore(json_data, blocks)
+        return None
+
+    microplate_names = Microplates(json_data).get(None, None)
+    indexof = {x: i for i, x in enumerate(microplate_names)}
+
+    num_spreadsheets = max(len(x[u'spreadsheets'])
+                           for x in json_data[u'iterations'])
+
+    shape = (len(json_data[u'iterations']),
+             num_spreadsheets,
+             len(microplate_names),
+             96)
+
+    array4d = numpy.empty(shape, dtype=numpy.float64)
+    array4d.fill(numpy.nan)
+
+    rows, targets = [], []
+    for i, iteration in enumerate(json_data[u'iterations']):
+        for j, spreadsheet in enumerate(iteration[u'spreadsheets']):
+            for name, microplate in spreadsheet[u'microplates'].iteritems():
+                values = microplate.pop(u'values', None)
+                if isinstance(values, _Row):
+                    rows.append(values)
+                    targets.append((i * shape[1] + j) * shape[2] +
+                                   indexof[name])
+                elif values:
+                    array4d[i, j, indexof[name]] = values
+
+    _restore(json_data, blocks)
+
+    # view of the same memory: (iteration, spreadsheet, microplate) x well
+    wells = array4d.reshape(-1, 96)
+
+    rows = numpy.array(rows, dtype=numpy.intp)
+    targets = numpy.array(targets, dtype=numpy.intp)
+
+    for i in xrange(len(blocks.arrays)):
+        selected = rows // blocks.block_size == i
+        array = blocks.arrays[i]
+        blocks.arrays[i] = None # release memory as early as possible
+        wells[targets[selected]] = array[rows[selected] % blocks.block_size]
+
+    return array4d
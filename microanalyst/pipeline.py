@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Stages of the data processing pipeline run on in-memory objects.
+
+Each stage mirrors one of the command line scripts, which can be chained
+with pipes, but here the intermediate JSON is neither serialized nor
+parsed again between the stages:
+>>> from microanalyst import pipeline
+>>> iterations = [pipeline.group(['series1/*.xls']),
+...               pipeline.group(['series2/*.xls'])]
+>>> pipeline.control(iterations, ['series1/ctrl.json', None])
+>>> json_data = pipeline.assemble(iterations)
+>>> pipeline.genes(json_data, 'genes.json')
+>>> model = pipeline.export(json_data, 'output.xlsx', 'vertical')
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import functools
+import multiprocessing
+
+from microanalyst.model import Model
+from microanalyst.commons import jsonutils, osutils
+from microanalyst.xls import cache, exporter, template
+from microanalyst.xls.tecan import get_microplates
+
+LAYOUTS = {
+    'horizontal': template.HorizontalTemplate,
+    'vertical': template.VerticalTemplate
+}
+
+# seconds to wait for the worker processes (effectively forever)
+_TIMEOUT = 7 * 24 * 60 * 60
+
+
+def group(filenames, annotations=None):
+    """Return a cluster of expanded filenames with optional annotations."""
+    cluster = dict(annotations or {})
+    cluster[u'files'] = osutils.expand(filenames)
+    return cluster
+
+
+def control(iterations, filenames):
+    """Load control wells of each iteration from JSON files in-place.
+
+    Use None or a dash character "-" to omit certain iterations.
+    """
+
+    if len(iterations) != len(filenames):
+        raise ValueError('JSON array has %d items but %d argument(s) '
+                         'provided' % (len(iterations), len(filenames)))
+
+    for i, filename in enumerate(filenames):
+
+        if filename in (None, '-'):
+            message = 'Warning: control wells for iteration #%d not provided'
+            print >> sys.stderr, message % (i + 1)
+            continue
+
+        if u'control' in iterations[i]:
+            print >> sys.stderr, 'Warning: "control" property overwritten'
+
+        iterations[i][u'control'] = load_json(filename)
+
+
+def assemble(iterations, reader=get_microplates, jobs=1, parse_cache=None):
+    """Return experiment data with spreadsheets read from clusters of files.
+
+    Clusters are modified in-place, i.e. their "files" are replaced with
+    "spreadsheets" sorted by the earliest timestamp of their microplates.
+    """
+
+    # read files of all iterations at once to keep the workers busy
+    filenames = [x for iteration in iterations for x in iteration[u'files']]
+    microplates = iter(read_files(filenames, reader, jobs, parse_cache))
+
+    for iteration in iterations:
+
+        files = iteration[u'files']
+        for i, filename in enumerate(files):
+            files[i] = {
+                u'filename': os.path.abspath(filename),
+                u'microplates': next(microplates)
+            }
+
+        # ISO 8601 dates can be sorted lexicographically
+        files.sort(key = lambda x: earliest(x[u'microplates']))
+
+        # rename "files" to "spreadsheets"
+        iteration[u'spreadsheets'] = iteration.pop(u'files')
+
+    return {u'iterations': iterations}
+
+
+def genes(json_data, filename):
+    """Load gene names from a JSON file into experiment data in-place."""
+
+    if type(json_data) is not dict:
+        raise TypeError('The root element of JSON input must be an object '
+                        'but got: %s' % type(json_data))
+
+    json_data[u'genes'] = load_json(filename)
+
+
+def export(json_data,
+           filename,
+           layout='horizontal',
+           css_filename=None,
+           colors=False,
+           binary=False,
+           jobs=1):
+    """Save experiment data to an xls[x] file and return the model."""
+
+    model = Model(json_data)
+
+    exporter.export(model,
+                    filename,
+                    LAYOUTS[layout],
+                    css_filename,
+                    colors,
+                    binary,
+                    jobs)
+
+    return model
+
+
+def load_json(filename):
+    with open(filename, 'r') as file_handle:
+        return json.load(file_handle)
+
+
+def save_json(json_data, filename, compact=None):
+    with open(filename, 'w') as file_handle:
+        jsonutils.dump(json_data, file_handle, compact)
+
+
+def get_cache(params):
+    """Return cache of parsed spreadsheets or None if disabled.
+
+    Expects the "no_cache", "cache_dir" and "cache_size" (in megabytes)
+    attributes of parsed command line arguments.
+    """
+
+    if params.no_cache:
+        return None
+
+    return cache.Cache(params.cache_dir, params.cache_size * 1024 * 1024)
+
+
+def get_reader(params):
+    """Return function reading microplates from a given filename.
+
+    Expects the "on_demand" attribute of parsed command line arguments.
+    """
+    return functools.partial(get_microplates, on_demand=params.on_demand)
+
+
+def read_microplates(filename, reader, parse_cache=None):
+    """Return microplates for a given filename, possibly from the cache."""
+
+    if parse_cache is None:
+        return reader(filename)
+
+    return parse_cache.get(filename, reader)
+
+
+def timed_read_microplates(filename, reader, parse_cache=None):
+    """Return microplates for a given filename and the time it took."""
+    start = time.time()
+    microplates = read_microplates(filename, reader, parse_cache)
+    return microplates, time.time() - start
+
+
+def read_files(filenames, reader, jobs, parse_cache=None):
+    """Return microplates for each of the filenames in their original order."""
+
+    jobs = osutils.num_processes(jobs)
+
+    if jobs == 1:
+        return [read_microplates(x, reader, parse_cache) for x in filenames]
+
+    worker = functools.partial(timed_read_microplates,
+                               reader=reader,
+                               parse_cache=parse_cache)
+
+    pool = multiprocessing.Pool(jobs)
+    try:
+        # unlike plain map() the async variant can be interrupted with Ctrl+C
+        results = pool.map_async(worker, filenames).get(_TIMEOUT)
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    for filename, (microplates, elapsed) in zip(filenames, results):
+        print >> sys.stderr, '%8.3fs %s' % (elapsed, filename)
+
+    return [microplates for microplates, elapsed in results]
+
+
+def date2str(iso8601):
+    """Return only the date portion of an ISO 8601 datetime."""
+    match = re.search(ur'([^T]+)T', iso8601)
+    return match.group(1) if match else None
+
+
+def earliest(microplates):
+    """Return the earliest timestamp of the microplates in a single file."""
+    timestamps = [date2str(microplates[x][u'timestamp']) for x in microplates]
+    timestamps.sort()
+    return timestamps[0]
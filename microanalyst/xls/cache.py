@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+On-disk cache of microplates read from Tecan(R) i-control(TM) spreadsheets.
+
+Instrument exports never change after acquisition, so their parsed contents
+are stored under a digest of the file contents and the parser version. Each
+entry is a compact binary record, while the total size of the cache is kept
+below a limit by evicting the least recently used entries.
+
+Sample usage:
+>>> from microanalyst.xls.cache import Cache
+>>> cache = Cache('/tmp/microanalyst')
+>>> microplates = cache.get('data.xls', get_microplates)
+"""
+
+import os
+import sys
+import math
+import struct
+import hashlib
+import tempfile
+
+from microanalyst.commons import uniutils
+
+
+# bump whenever the structure returned by the reader changes
+PARSER_VERSION = 1
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+_MAGIC = 'MACH'
+_HEADER = struct.Struct('<4sHI')
+_LENGTH = struct.Struct('<H')
+_TEMPERATURE = struct.Struct('<d')
+_NUM_VALUES = struct.Struct('<I')
+
+
+class Cache(object):
+    """Directory of parsed spreadsheets keyed by their contents."""
+
+    def __init__(self, dirname=None, max_size=DEFAULT_MAX_SIZE):
+        self.dirname = dirname or default_dirname()
+        self.max_size = max_size
+
+    def get(self, filename, reader):
+        """Return microplates for a filename, calling reader() on a miss."""
+
+        path = os.path.join(self.dirname, digest(filename))
+
+        try:
+            with open(path, 'rb') as file_handle:
+                microplates = loads(file_handle.read())
+            os.utime(path, None) # mark as recently used
+            return microplates
+        except (IOError, OSError, ValueError, struct.error):
+            pass
+
+        microplates = reader(filename)
+
+        try:
+            self._put(path, dumps(microplates))
+            self._evict()
+        except (IOError, OSError) as ex:
+            print >> sys.stderr, 'Warning: unable to cache "%s": %s' % (
+                uniutils.escape_unicode(filename), ex)
+
+        return microplates
+
+    def size(self):
+        """Return the total size of cache entries in bytes."""
+        return sum(size for path, size, mtime in self._entries())
+
+    def _put(self, path, data):
+        """Write cache entry atomically."""
+
+        if not os.path.isdir(self.dirname):
+            os.makedirs(self.dirname)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.dirname, prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file_handle:
+                file_handle.write(data)
+            if os.path.exists(path):
+                os.remove(path) # Windows cannot rename onto existing files
+            os.rename(tmp_path, path)
+        except:
+            os.remove(tmp_path)
+            raise
+
+    def _evict(self):
+        """Remove least recently used entries until below the size limit."""
+
+        entries = sorted(self._entries(), key=lambda x: x[2], reverse=True)
+
+        total_size = 0
+        for path, size, mtime in entries:
+            total_size += size
+            if total_size > self.max_size:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass # removed concurrently by another process
+
+    def _entries(self):
+        """Return a list of (path, size, mtime) tuples."""
+
+        entries = []
+        for name in os.listdir(self.dirname):
+            if not name.startswith('.'):
+                path = os.path.join(self.dirname, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+
+        return entries
+
+
+def default_dirname():
+    """Return per-user cache directory."""
+    return os.path.join(os.path.expanduser('~'), '.microanalyst', 'cache')
+
+
+def digest(filename, chunk_size=1024*1024):
+    """Return hex digest of the file contents and parser version."""
+
+    sha1 = hashlib.sha1('microanalyst:%d:' % PARSER_VERSION)
+
+    with open(filename, 'rb') as file_handle:
+        for chunk in iter(lambda: file_handle.read(chunk_size), ''):
+            sha1.update(chunk)
+
+    return sha1.hexdigest()
+
+
+def dumps(microplates):
+    """Serialize microplates to a compact binary string."""
+
+    chunks = [_HEADER.pack(_MAGIC, PARSER_VERSION, len(microplates))]
+
+    for name in sorted(microplates):
+
+        microplate = microplates[name]
+
+        temperature = microplate[u'temperature']
+        if temperature is None:
+            temperature = float('nan')
+
+        values = microplate[u'values']
+
+        chunks.append(_pack_text(name))
+        chunks.append(_pack_text(microplate[u'timestamp']))
+        chunks.append(_TEMPERATURE.pack(temperature))
+        chunks.append(_NUM_VALUES.pack(len(values)))
+        chunks.append(struct.pack('<%dd' % len(values), *values))
+
+    return ''.join(chunks)
+
+
+def loads(data):
+    """Deserialize microplates from a binary string."""
+
+    magic, version, num_microplates = _HEADER.unpack_from(data)
+
+    if magic != _MAGIC or version != PARSER_VERSION:
+        raise ValueError('Incompatible cache entry')
+
+    offset = _HEADER.size
+
+    microplates = {}
+    for _ in xrange(num_microplates):
+
+        name, offset = _unpack_text(data, offset)
+        timestamp, offset = _unpack_text(data, offset)
+
+        temperature, = _TEMPERATURE.unpack_from(data, offset)
+        offset += _TEMPERATURE.size
+
+        if math.isnan(temperature):
+            temperature = None
+
+        num_values, = _NUM_VALUES.unpack_from(data, offset)
+        offset += _NUM_VALUES.size
+
+        values = struct.unpack_from('<%dd' % num_values, data, offset)
+        offset += 8 * num_values
+
+        microplates[name] = {
+            u'timestamp': timestamp,
+            u'temperature': temperature,
+            u'values': list(values)
+        }
+
+    if offset != len(data):
+        raise ValueError('Corrupted cache entry')
+
+    return microplates
+
+
+def _pack_text(text):
+    """Return length-prefixed UTF-8 string."""
+    encoded = text.encode('utf-8')
+    return _LENGTH.pack(len(encoded)) + encoded
+
+
+def _unpack_text(data, offset):
+    """Return Unicode string and the offset past it."""
+    length, = _LENGTH.unpack_from(data, offset)
+    offset += _LENGTH.size
+    return data[offset:offset + length].decode('utf-8'), offset + length
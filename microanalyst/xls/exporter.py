@@ -29,10 +29,10 @@ Skeleton for scripts exporting JSON data to Microsoft(R) Excel(TM).
 import os
 import sys
 import argparse
-import json
 
 import xlwt
 
+from microanalyst.xls import xlsx
 from microanalyst.model import Model
 from microanalyst.commons import osutils, uniutils
 
@@ -43,8 +43,8 @@ class Exporter(object):
     def __init__(self, TemplateClass):
 
         if sys.stdin.isatty():
-            usage = 'usage: (...) | %s <file.xls> [-f] [--binary]' \
-                    ' [--colors] [--stylesheet <file.css>]'
+            usage = 'usage: (...) | %s <file.xls[x]> [-f] [--binary]' \
+                    ' [--colors] [--stylesheet <file.css>] [--jobs <N>]'
             print usage % os.path.basename(sys.argv[0])
         else:
 
@@ -54,17 +54,18 @@ class Exporter(object):
                 print 'File already exists. Use the -f flag to force overwrite.'
             else:
 
-                workbook = xlwt.Workbook()
+                workbook = _get_workbook(params.filename)
 
                 print '[1/3] Processing...',
-                model = Model(json.loads(u''.join(uniutils.stdin())))
+                model = Model.loads(uniutils.read_stdin())
                 print 'done'
 
                 template = TemplateClass(
                     model,
                     params.stylesheet,
                     params.colors,
-                    params.binary)
+                    params.binary,
+                    params.jobs)
 
                 print '[2/3] Rendering...',
                 template.render(workbook)
@@ -77,8 +78,29 @@ class Exporter(object):
                 osutils.open_with_default_app(params.filename)
 
 
+def export(model,
+           filename,
+           TemplateClass,
+           css_filename=None,
+           colors=False,
+           binary=False,
+           jobs=1):
+    """Render the model with a given template and save it to a file."""
+
+    workbook = _get_workbook(filename)
+
+    try:
+        template = TemplateClass(model, css_filename, colors, binary, jobs)
+        template.render(workbook)
+        workbook.save(filename)
+    finally:
+        if isinstance(workbook, xlsx.Workbook):
+            workbook.close()
+
+
 def _parse(args):
-    """<file.xls> [-f] [--binary] [--colors] [--stylesheet <file.css>]"""
+    """<file.xls[x]> [-f] [--binary] [--colors] [--stylesheet <file.css>]
+    [--jobs <N>]"""
 
     parser = argparse.ArgumentParser()
     parser.add_argument('filename')
@@ -86,8 +108,30 @@ def _parse(args):
     parser.add_argument('--stylesheet', metavar='style.css')
     parser.add_argument('--colors', action='store_true', default=False)
     parser.add_argument('--binary', action='store_true', default=False)
+    parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                        help='number of worker processes (0 for all cores), '
+                             'only for .xlsx files')
+
+    params = parser.parse_args(args)
+
+    if params.jobs != 1 and not is_xlsx(params.filename):
+        parser.error('--jobs requires an .xlsx file')
+
+    return params
+
+
+def is_xlsx(filename):
+    """Check if a file should be written in the Office Open XML format."""
+    return os.path.splitext(filename)[1].lower() == '.xlsx'
+
+
+def _get_workbook(filename):
+    """Return workbook with a backend matching the file extension."""
+
+    if is_xlsx(filename):
+        return xlsx.Workbook()
 
-    return parser.parse_args(args)
+    return xlwt.Workbook()
 
 
 def _can_write(params):
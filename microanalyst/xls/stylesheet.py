@@ -41,6 +41,8 @@ Supported selectors:
 Styles can be commented out.
 
 XF records are cached due to the upper limit of 4k in a single xls file.
+The record resolved for a given selector and set of truthy keyword arguments
+is memoized as well, so that repeated lookups skip merging declarations.
 
 Sample usage:
 >>> from microanalyst.xls import stylesheet
@@ -52,6 +54,8 @@ Sample usage:
 import re
 import xlwt
 
+_NO_CLASSES = frozenset()
+
 
 def load(filename):
     """Return Stylesheet object loaded from a file."""
@@ -71,13 +75,25 @@ class Stylesheet(object):
         """@param styles: a dict of selectors and style declarations"""
         self._styles = styles
         self._cache = {}
+        self._memo = {}
 
     def __str__(self):
         return str(self._styles)
 
     def __call__(self, selector, **kwargs):
         """Return XF record for the given selectors."""
-        return self._get_xf_record(self._synthesize(selector, **kwargs))
+
+        if kwargs:
+            key = selector, frozenset(x for x in kwargs if kwargs[x])
+        else:
+            key = selector, _NO_CLASSES
+
+        try:
+            return self._memo[key]
+        except KeyError:
+            xf = self._get_xf_record(self._synthesize(selector, **kwargs))
+            self._memo[key] = xf
+            return xf
 
     def peek(self, selector):
         """Return style declarations for the given selector."""
@@ -87,6 +103,7 @@ class Stylesheet(object):
         """Make an in-place union with another Stylesheet object."""
         self._styles = dict(self._styles, **stylesheet._styles)
         self._cache = dict(self._cache, **stylesheet._cache)
+        self._memo = {}
 
     def inline(self, text):
         """Return XF record for selector-less style declarations."""
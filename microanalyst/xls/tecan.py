@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Reader of Microsoft(R) Excel(TM) spreadsheet files with microplate
+measurements obtained with Tecan(R) i-control(TM) software.
+
+Well values of all microplates in a workbook are extracted from the fixed
+B25:M32 block of each worksheet straight into a single numpy array:
+>>> from microanalyst.xls import tecan
+>>> plates = tecan.read('data.xls')
+>>> plates.names
+[u'001', u'002', u'003']
+>>> plates.values.shape
+(3, 96)
+"""
+
+import gc
+import re
+import time
+import datetime
+import collections
+
+import numpy
+import xlrd
+
+from microanalyst.commons import uniutils
+
+
+SIGNATURE = 'Application: Tecan i-control'
+
+# zero-based coordinates of cells within a worksheet
+TIMESTAMP_CELL = (20, 1)
+TEMPERATURE_CELL = (22, 1)
+FIRST_ROW, LAST_ROW = 24, 32
+FIRST_COL, LAST_COL = 1, 13
+
+
+Plates = collections.namedtuple('Plates', [
+    'names',        # list of worksheet names
+    'timestamps',   # list of ISO 8601 strings
+    'temperatures', # list of floats or None
+    'values'        # float array: microplate x well
+])
+
+
+def is_valid(sheet):
+    """Check if worksheet conforms to Tecan(R) i-control(TM) format."""
+    if sheet.nrows >= 36 and sheet.ncols >= 13:
+        return sheet.cell_value(0, 0) == SIGNATURE
+
+
+def parse_datetime(text):
+    """Return date and time according to ISO 8601 standard."""
+    tm_struct = time.strptime(text, '%Y-%m-%d %H:%M:%S')
+    iso8601 = datetime.datetime(*tm_struct[0:6]).isoformat()
+    return uniutils.str2unicode(iso8601)
+
+
+def parse_temperature(text):
+    """Return temperature in Celsius degrees."""
+    match = re.search(ur'\s([^\s]+)\s', text)
+    return float(match.group(1)) if match else None
+
+
+def read(filename, on_demand=False):
+    """Return Plates with all valid worksheets of a given workbook.
+
+    With on_demand enabled worksheets are loaded one at a time and
+    released as soon as their values have been copied, which keeps
+    memory usage flat regardless of the number and size of worksheets
+    (e.g. extra charts or summaries). Otherwise the whole workbook is
+    loaded up front.
+    """
+
+    workbook = xlrd.open_workbook(filename, on_demand=on_demand)
+    try:
+
+        names, timestamps, temperatures = [], [], []
+        values = numpy.empty((workbook.nsheets, 96), dtype=numpy.float64)
+
+        for index in xrange(workbook.nsheets):
+
+            sheet = workbook.sheet_by_index(index)
+
+            if is_valid(sheet):
+                read_values(sheet, values[len(names)])
+                names.append(sheet.name)
+                timestamps.append(
+                    parse_datetime(sheet.cell_value(*TIMESTAMP_CELL)))
+                temperatures.append(
+                    parse_temperature(sheet.cell_value(*TEMPERATURE_CELL)))
+
+            if on_demand:
+                del sheet
+                workbook.unload_sheet(index)
+                gc.collect() # worksheets hold reference cycles
+
+    finally:
+        workbook.release_resources()
+
+    return Plates(names, timestamps, temperatures, values[:len(names)])
+
+
+def read_values(sheet, out):
+    """Copy well values in row-major order into a 96-element array."""
+    for i, row in enumerate(xrange(FIRST_ROW, LAST_ROW)):
+        out[i*12:(i + 1)*12] = sheet.row_values(row, FIRST_COL, LAST_COL)
+
+
+def get_microplates(filename, on_demand=False):
+    """Return microplates and their values for a given filename."""
+
+    plates = read(filename, on_demand)
+
+    microplates = {}
+    for i, name in enumerate(plates.names):
+        microplates[name] = {
+            u'timestamp': plates.timestamps[i],
+            u'temperature': plates.temperatures[i],
+            u'values': plates.values[i].tolist()
+        }
+
+    return microplates
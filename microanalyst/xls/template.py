@@ -22,11 +22,18 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import sys
 import numpy
 import itertools
+import multiprocessing
 
-from microanalyst.xls import stylesheet
+import xlwt
+
+from microanalyst.xls import stylesheet, xlsx
+from microanalyst.commons import osutils
 from microanalyst.model import thresholds
+from microanalyst.model import categories
+from microanalyst.model.commons import to_list
 
 
 class Template(object):
@@ -34,6 +41,13 @@ class Template(object):
 
     CHAR_WIDTH = 256
 
+    CATEGORY_STYLES = {
+        categories.STARVED: '.starved',
+        categories.INFECTED: '.infected',
+        categories.CONTROL: '.control',
+        categories.VIOLATED: '.violated'
+    }
+
     DEFAULT_STYLE = """
         * {
             border-color: gray25;
@@ -84,7 +98,12 @@ class Template(object):
         }
     """
 
-    def __init__(self, model, css_filename=None, colors=False, binary=False):
+    def __init__(self,
+                 model,
+                 css_filename=None,
+                 colors=False,
+                 binary=False,
+                 jobs=1):
 
         self.model = model
         self.genes = model.genes()
@@ -93,6 +112,7 @@ class Template(object):
 
         self.colors_enabled = colors
         self.binary_enabled = binary
+        self.jobs = osutils.num_processes(jobs)
 
         self.styles = stylesheet.parse(Template.DEFAULT_STYLE)
 
@@ -108,13 +128,13 @@ class Template(object):
             self.alt_zero = has_no_background('.zero')
             self.alt_other = has_no_background('.other')
 
-        self.is_starved,\
-        self.is_infected,\
-        self.is_violated = thresholds.default()
-
     def render(self, workbook):
         """Fill spreadsheet with values from the model."""
 
+        if self.jobs > 1 and not isinstance(workbook, xlsx.Workbook):
+            raise ValueError('Rendering with several jobs requires an xlsx '
+                             'workbook')
+
         if self.colors_enabled and not self.binary_enabled:
             self._render_legend(workbook)
 
@@ -166,7 +186,147 @@ class Template(object):
 
         self._set_column_width(sheet, 1, 'control violated')
 
-    def _get_well_style(self, iteration, spreadsheet, microplate, well, value):
+    def _render_rows(self, sheet, first_row, microplate_name, leading=()):
+        """Write a complete row per well of a microplate and flush it.
+
+        A row is made of leading cells, the well name, the gene name (if
+        any genes are defined) and microplate values across iterations and
+        spreadsheets, which lets the writer release rows one by one.
+        """
+
+        values = self.model.values(microplate=microplate_name)
+        categories = self.model.categories(microplate=microplate_name)
+
+        num_iter, num_spreadsheets = values.shape[:2]
+        iterations = [x for x in xrange(num_iter)
+                      for y in xrange(num_spreadsheets)]
+
+        # well x (iteration, spreadsheet)
+        values = values.reshape(-1, 96).T
+        categories = categories.reshape(-1, 96).T
+
+        if self.has_genes:
+            well_style = xlwt.Style.default_style
+        else:
+            well_style = self.styles('.header')
+
+        for w, well_name in enumerate(self.model.well_names()):
+
+            row_index = first_row + w
+            column_index = len(leading)
+
+            for i, value in enumerate(leading):
+                sheet.write(row_index, i, value)
+
+            sheet.write(row_index, column_index, well_name, well_style)
+
+            gene_name = self.model.gene_at(well_name, microplate_name)
+
+            if gene_name:
+                sheet.write(row_index,
+                            column_index + 1,
+                            gene_name,
+                            self.styles('.header'))
+
+            column_index = self.column_offset
+
+            for x, value, category in zip(iterations,
+                                          self._get_cells(values[w]),
+                                          categories[w]):
+
+                style = self._get_well_style(x, value, category)
+                sheet.write(row_index, column_index, value, style)
+
+                column_index += 1
+
+            self._flush_row_data(sheet)
+
+    def _start_workers(self, workbook):
+        """Return a pool of worker processes or None to render sequentially.
+
+        Workers inherit the template and the workbook from this process
+        rather than receive pickled copies, which would neither share the
+        model nor keep identities of styles, hence they are only started
+        where processes get forked. Every style the rows may use is added
+        to the workbook beforehand to keep indices of cell formats the same
+        across processes.
+        """
+
+        if self.jobs == 1:
+            return None
+
+        if not _CAN_FORK:
+            print >> sys.stderr, \
+                'Warning: rendering sequentially, since processes cannot ' \
+                'be forked on this platform'
+            return None
+
+        for style in self._get_row_styles():
+            workbook.add_style(style)
+
+        # classify wells before forking so that workers inherit the result
+        self.model.categories()
+
+        try:
+            return multiprocessing.Pool(self.jobs,
+                                        _initialize_worker,
+                                        (self, workbook))
+        except (OSError, ImportError) as ex:
+            print >> sys.stderr, \
+                'Warning: rendering sequentially, since worker processes ' \
+                'failed to start: %s' % ex
+            return None
+
+    @staticmethod
+    def _render_in_parallel(pool, tasks):
+        """Yield rows rendered by worker processes in order of the tasks.
+
+        Each task is a tuple of arguments to _render_rows() without the
+        sheet. Workers render rows into detached buffers of the workbook
+        and return them serialized, so that they only have to be appended
+        to a sheet with append_row_data(). The pool is closed afterwards.
+        """
+        try:
+            for rows in pool.imap(_render_xml, tasks):
+                yield rows
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+    def _get_row_styles(self):
+        """Return every style which _render_rows() may pick for a cell."""
+
+        styles = [xlwt.Style.default_style, self.styles('.header')]
+
+        for iteration in (0, 1):
+            for value in (None, 0, 1, 0.5):
+                for category in [None] + sorted(Template.CATEGORY_STYLES):
+                    styles.append(
+                        self._get_well_style(iteration, value, category))
+
+        return styles
+
+    @staticmethod
+    def _flush_row_data(sheet):
+        """Release rows of a sheet unless it holds a file open for them.
+
+        xlwt spills flushed rows into a temporary file per sheet, which is
+        kept open until the workbook gets saved and would run out of file
+        descriptors on workbooks with many sheets.
+        """
+        if not isinstance(sheet, xlwt.Worksheet):
+            sheet.flush_row_data()
+
+    @staticmethod
+    def _get_cells(values):
+        """Return a list of cell values with None in place of missing ones."""
+        return to_list(values)
+
+    def _get_well_style(self, iteration, value, category):
+        """Return style for a well based on its value or category."""
 
         if value is not None and self.colors_enabled:
 
@@ -183,20 +343,8 @@ class Template(object):
                 else:
                     return get_binary_style('.other', self.alt_other)
             else:
-
-                if self.model.is_control(iteration,
-                                         spreadsheet,
-                                         microplate,
-                                         well):
-                    if self.is_violated(value):
-                        return self.styles('.violated')
-                    else:
-                        return self.styles('.control')
-                else:
-                    if self.is_starved(value):
-                        return self.styles('.starved')
-                    elif self.is_infected(value):
-                        return self.styles('.infected')
+                if category in Template.CATEGORY_STYLES:
+                    return self.styles(Template.CATEGORY_STYLES[category])
 
         return self.styles('.default',
                            alt=iteration % 2,
@@ -210,3 +358,116 @@ class Template(object):
     def _set_column_width(sheet, column_index, text):
         """Set width of a spreadsheet column to accomodate the given text."""
         sheet.col(column_index).set_width(len(text)*Template.CHAR_WIDTH)
+
+
+class HorizontalTemplate(Template):
+    """Template with microplates kept in separate sheets."""
+
+    def _render_data(self, workbook):
+
+        names = self.model.microplate_names()
+        pool = self._start_workers(workbook)
+
+        if pool is None:
+            for name in names:
+                self._render_microplate(workbook, name)
+        else:
+            tasks = [(1, name) for name in names]
+            for name, rows in itertools.izip(
+                    names, self._render_in_parallel(pool, tasks)):
+                self._render_microplate(workbook, name, rows)
+
+    def _render_microplate(self, workbook, microplate_name, rows=None):
+
+        sheet = workbook.add_sheet(microplate_name)
+
+        self._render_header(sheet)
+
+        if rows is None:
+            self._render_rows(sheet, 1, microplate_name)
+        else:
+            sheet.append_row_data(*rows)
+
+        self._adjust_column_widths(sheet)
+
+    def _adjust_column_widths(self, sheet):
+
+        self._adjust_column_width(sheet, 0, self.model.well_names(), 2)
+
+        if self.has_genes:
+            self._adjust_column_width(sheet, 1, self.genes, 3)
+
+
+class VerticalTemplate(Template):
+    """Template with all microplates kept in a single sheet."""
+
+    def _render_data(self, workbook):
+
+        sheet = workbook.add_sheet('Microplates')
+
+        self.column_offset += 1 # account for a column with microplate name
+
+        self._render_header(sheet)
+
+        pool = self._start_workers(workbook)
+
+        if pool is None:
+            self._render_microplates(sheet)
+        else:
+            tasks = [self._get_task(i, name) for i, name in
+                     enumerate(self.model.microplate_names())]
+            for rows in self._render_in_parallel(pool, tasks):
+                sheet.append_row_data(*rows)
+
+        self._adjust_column_widths(sheet)
+
+    def _render_microplates(self, sheet):
+        for i, name in enumerate(self.model.microplate_names()):
+            self._render_microplate(sheet, i, name)
+
+    def _render_microplate(self, sheet, index, microplate_name):
+        self._render_rows(sheet, *self._get_task(index, microplate_name))
+
+    @staticmethod
+    def _get_task(index, microplate_name):
+        """Return arguments of _render_rows() for a microplate."""
+        first_row = 1 + index * 96
+        leading = (microplate_name,)
+        return first_row, microplate_name, leading
+
+    def _adjust_column_widths(self, sheet):
+
+        self._adjust_column_width(sheet, 0, self.model.microplate_names(), 2)
+        self._adjust_column_width(sheet, 1, self.model.well_names(), 2)
+
+        if self.has_genes:
+            self._adjust_column_width(sheet, 2, self.genes, 3)
+
+
+# multiprocessing forks workers everywhere but on Windows
+_CAN_FORK = sys.platform != 'win32'
+
+_worker_template = None
+_worker_workbook = None
+
+
+def _initialize_worker(template, workbook):
+    """Keep a template and a workbook with all styles added up front.
+
+    Both are inherited from the parent process through fork() rather than
+    pickled.
+    """
+
+    global _worker_template, _worker_workbook
+
+    _worker_template = template
+    _worker_workbook = workbook
+
+
+def _render_xml(task):
+    """Return a tuple (xml, last_row) of rows rendered for a task."""
+
+    sheet = _worker_workbook.row_buffer()
+    _worker_template._render_rows(sheet, *task)
+
+    return sheet.dump_row_data()
@@ -0,0 +1,593 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Streaming writer of Office Open XML workbooks (.xlsx).
+
+The API mimics the subset of xlwt used by the templates, so that the same
+code and the same XF records produced by the stylesheet module can render
+either format. Unlike xlwt the workbook is not kept in memory. Rows are
+buffered until flush_row_data() is called, after which they are written to
+a temporary file per sheet. The final package is assembled on save(),
+whereas close() only removes the temporary files.
+Rows can also be rendered elsewhere, e.g. in worker processes, with a
+detached RowBuffer and then appended to a sheet as serialized XML.
+
+Indexed colors of xlwt map directly onto the legacy palette of xlsx.
+
+Sample usage:
+>>> from microanalyst.xls import xlsx
+>>> workbook = xlsx.Workbook()
+>>> sheet = workbook.add_sheet('Microplates')
+>>> sheet.write(0, 0, 'A1', style)
+>>> sheet.col(0).set_width(10 * 256)
+>>> sheet.flush_row_data()
+>>> workbook.save('output.xlsx')
+"""
+
+import os
+import shutil
+import numbers
+import zipfile
+import tempfile
+
+import xlwt
+
+from xml.sax.saxutils import escape, quoteattr
+
+
+MAX_ROWS = 1048576
+MAX_COLS = 16384
+
+CHAR_WIDTH = 256.0
+
+_DEFAULT_STYLE = xlwt.Style.default_style
+
+_HORIZONTAL_ALIGNMENT = {
+    xlwt.Alignment.HORZ_LEFT: 'left',
+    xlwt.Alignment.HORZ_CENTER: 'center',
+    xlwt.Alignment.HORZ_RIGHT: 'right',
+    xlwt.Alignment.HORZ_FILLED: 'fill',
+    xlwt.Alignment.HORZ_JUSTIFIED: 'justify',
+    xlwt.Alignment.HORZ_CENTER_ACROSS_SEL: 'centerContinuous',
+    xlwt.Alignment.HORZ_DISTRIBUTED: 'distributed'
+}
+
+_BORDER_STYLES = {
+    xlwt.Borders.THIN: 'thin',
+    xlwt.Borders.MEDIUM: 'medium',
+    xlwt.Borders.DASHED: 'dashed',
+    xlwt.Borders.DOTTED: 'dotted',
+    xlwt.Borders.THICK: 'thick',
+    xlwt.Borders.DOUBLE: 'double',
+    xlwt.Borders.HAIR: 'hair'
+}
+
+_BUILTIN_NUMBER_FORMATS = {
+    'General': 0,
+    '0': 1,
+    '0.00': 2,
+    '#,##0': 3,
+    '#,##0.00': 4,
+    '0%': 9,
+    '0.00%': 10,
+    '0.00E+00': 11,
+    '@': 49
+}
+
+_AUTOMATIC_COLOUR = 0x7FFF
+
+_NAMESPACE = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_RELATIONSHIPS = \
+    'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PACKAGE_RELATIONSHIPS = \
+    'http://schemas.openxmlformats.org/package/2006/relationships'
+_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.'
+
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+
+class Workbook(object):
+    """Collection of sheets sharing a table of cell styles."""
+
+    def __init__(self):
+        self._sheets = []
+        self._styles = _Styles()
+
+    def add_sheet(self, name):
+        """Return a new sheet appended to the workbook."""
+
+        if len(name) > 31:
+            raise ValueError('Sheet name too long: "%s"' % name)
+
+        if name.lower() in [x.name.lower() for x in self._sheets]:
+            raise ValueError('Duplicate sheet name: "%s"' % name)
+
+        sheet = Worksheet(name, self._styles)
+        self._sheets.append(sheet)
+
+        return sheet
+
+    def add_style(self, style):
+        """Register a cell style and return index of its format."""
+        return self._styles.index(style)
+
+    def row_buffer(self):
+        """Return a detached sheet sharing cell formats of the workbook."""
+        return RowBuffer(self._styles)
+
+    def save(self, filename):
+        """Write the workbook to a file and remove temporary files."""
+
+        with zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED) as package:
+
+            package.writestr('[Content_Types].xml', self._content_types())
+            package.writestr('_rels/.rels', _root_relationships())
+            package.writestr('xl/workbook.xml', self._workbook())
+            package.writestr('xl/_rels/workbook.xml.rels',
+                             self._relationships())
+            package.writestr('xl/styles.xml', self._styles.to_xml())
+
+            for i, sheet in enumerate(self._sheets):
+                sheet.save(package, 'xl/worksheets/sheet%d.xml' % (i + 1))
+
+    def close(self):
+        """Remove temporary files of the sheets without saving them.
+
+        Call it when rendering fails or the workbook is discarded, since
+        otherwise only save() removes the files.
+        """
+        for sheet in self._sheets:
+            sheet.close()
+
+    def _content_types(self):
+
+        sheets = ''.join(
+            '<Override PartName="/xl/worksheets/sheet%d.xml" '
+            'ContentType="%sworksheet+xml"/>' % (i + 1, _CONTENT_TYPE)
+            for i in xrange(len(self._sheets)))
+
+        return (_XML_HEADER +
+                '<Types xmlns="http://schemas.openxmlformats.org/package/'
+                '2006/content-types">'
+                '<Default Extension="rels" ContentType="application/'
+                'vnd.openxmlformats-package.relationships+xml"/>'
+                '<Default Extension="xml" ContentType="application/xml"/>'
+                '<Override PartName="/xl/workbook.xml" '
+                'ContentType="%ssheet.main+xml"/>'
+                '<Override PartName="/xl/styles.xml" '
+                'ContentType="%sstyles+xml"/>'
+                '%s</Types>' % (_CONTENT_TYPE, _CONTENT_TYPE, sheets))
+
+    def _workbook(self):
+
+        sheets = ''.join(
+            '<sheet name=%s sheetId="%d" r:id="rId%d"/>' %
+            (quoteattr(_encode(x.name)), i + 1, i + 1)
+            for i, x in enumerate(self._sheets))
+
+        return (_XML_HEADER +
+                '<workbook xmlns="%s" xmlns:r="%s">'
+                '<sheets>%s</sheets></workbook>' %
+                (_NAMESPACE, _RELATIONSHIPS, sheets))
+
+    def _relationships(self):
+
+        relationships = [
+            '<Relationship Id="rId%d" Type="%s/worksheet" '
+            'Target="worksheets/sheet%d.xml"/>' % (i, _RELATIONSHIPS, i)
+            for i in xrange(1, len(self._sheets) + 1)
+        ]
+
+        relationships.append(
+            '<Relationship Id="rId%d" Type="%s/styles" '
+            'Target="styles.xml"/>' % (len(self._sheets) + 1, _RELATIONSHIPS))
+
+        return (_XML_HEADER +
+                '<Relationships xmlns="%s">%s</Relationships>' %
+                (_PACKAGE_RELATIONSHIPS, ''.join(relationships)))
+
+
+class Worksheet(object):
+    """Sheet buffering rows in memory until they are flushed to disk."""
+
+    def __init__(self, name, styles):
+        self.name = name
+        self._styles = styles
+        self._rows = {}
+        self._columns = {}
+        self._last_flushed_row = -1
+        self._filename = None
+
+    def write(self, row, col, label='', style=_DEFAULT_STYLE):
+        """Set value of a cell, None denoting a blank cell."""
+
+        if not (0 <= row < MAX_ROWS and 0 <= col < MAX_COLS):
+            raise ValueError('Cell (%d, %d) out of range' % (row, col))
+
+        if row <= self._last_flushed_row:
+            raise ValueError('Attempt to reuse row index %d of sheet "%s" '
+                             'after flushing' % (row, self.name))
+
+        cells = self._rows.setdefault(row, {})
+        cells[col] = (label, self._styles.index(style))
+
+    def col(self, index):
+        """Return column object for setting its width."""
+        if index not in self._columns:
+            self._columns[index] = Column()
+        return self._columns[index]
+
+    def flush_row_data(self):
+        """Write buffered rows to a temporary file and release them.
+
+        The file is only kept open while writing, so that workbooks with
+        many sheets don't run out of file descriptors.
+        """
+
+        if self._rows:
+            self._spill(*self._dump_rows())
+
+    def append_row_data(self, xml, last_row):
+        """Append rows serialized by a RowBuffer of the same workbook.
+
+        Buffered rows are flushed first, and the appended ones must follow
+        them.
+        """
+
+        self.flush_row_data()
+
+        if not xml:
+            return
+
+        if last_row <= self._last_flushed_row:
+            raise ValueError('Attempt to append row index %d of sheet "%s" '
+                             'after flushing' % (last_row, self.name))
+
+        self._spill(xml, last_row)
+
+    def _dump_rows(self):
+        """Return a tuple (xml, last_row) of buffered rows and release them."""
+
+        xml = ''.join(_row_xml(row, self._rows[row])
+                      for row in sorted(self._rows))
+        last_row = max(self._rows)
+
+        self._rows = {}
+
+        return xml, last_row
+
+    def _spill(self, xml, last_row):
+        """Append serialized rows to the temporary file of the sheet."""
+
+        if self._filename is None:
+            handle, self._filename = tempfile.mkstemp(suffix='.xml')
+            os.close(handle)
+
+        with open(self._filename, 'ab') as file_handle:
+            file_handle.write(xml)
+
+        self._last_flushed_row = last_row
+
+    def save(self, package, arcname):
+        """Add the sheet to a zip package and remove temporary files."""
+
+        self.flush_row_data()
+
+        handle, filename = tempfile.mkstemp(suffix='.xml')
+
+        try:
+            with os.fdopen(handle, 'wb') as file_handle:
+
+                file_handle.write(_XML_HEADER)
+                file_handle.write('<worksheet xmlns="%s">' % _NAMESPACE)
+                file_handle.write(self._columns_xml())
+                file_handle.write('<sheetData>')
+
+                if self._filename is not None:
+                    with open(self._filename, 'rb') as rows:
+                        shutil.copyfileobj(rows, file_handle)
+
+                file_handle.write('</sheetData></worksheet>')
+
+            package.write(filename, arcname)
+
+        finally:
+            os.remove(filename)
+            self.close()
+
+    def close(self):
+        """Remove the temporary file with flushed rows, if any."""
+        if self._filename is not None:
+            os.remove(self._filename)
+            self._filename = None
+
+    def _columns_xml(self):
+
+        if not self._columns:
+            return ''
+
+        return '<cols>%s</cols>' % ''.join(
+            '<col min="%d" max="%d" width="%.2f" customWidth="1"/>' %
+            (i + 1, i + 1, self._columns[i].width / CHAR_WIDTH)
+            for i in sorted(self._columns))
+
+
+class Column(object):
+    """Column properties, only the width is supported."""
+
+    def __init__(self):
+        self.width = 0x0B6D # xlwt's default
+
+    def set_width(self, width):
+        """Set width in 1/256 of the zero character width."""
+        self.width = width
+
+
+class RowBuffer(Worksheet):
+    """Detached sheet serializing its rows rather than writing them to disk.
+
+    Rows refer to cell formats of the workbook, which makes it possible to
+    render them in a worker process with a copy of the workbook and append
+    them to a sheet afterwards. To keep indices of the formats in line with
+    the original workbook all styles must be added to it up front.
+    """
+
+    def __init__(self, styles):
+        super(RowBuffer, self).__init__(None, styles)
+        self._num_styles = len(styles)
+
+    def write(self, row, col, label='', style=_DEFAULT_STYLE):
+        """Set value of a cell, None denoting a blank cell."""
+
+        super(RowBuffer, self).write(row, col, label, style)
+
+        if len(self._styles) > self._num_styles:
+            raise ValueError('Style of cell (%d, %d) must be added to the '
+                             'workbook up front' % (row, col))
+
+    def flush_row_data(self):
+        """Keep rows until they are serialized with dump_row_data()."""
+
+    def dump_row_data(self):
+        """Return a tuple (xml, last_row) of buffered rows and release them.
+
+        The result is meant for Worksheet.append_row_data().
+        """
+
+        if not self._rows:
+            return '', -1
+
+        return self._dump_rows()
+
+
+class _Styles(object):
+    """Registry of xlwt XF records translated to xlsx cell formats."""
+
+    def __init__(self):
+        self._records = [_DEFAULT_STYLE]
+        self._indices = {id(_DEFAULT_STYLE): 0}
+
+    def __len__(self):
+        return len(self._records)
+
+    def index(self, style):
+        """Return index of a cell format, registering a new one if needed."""
+
+        key = id(style)
+
+        if key not in self._indices:
+            # records are referenced here, hence their ids remain unique
+            self._indices[key] = len(self._records)
+            self._records.append(style)
+
+        return self._indices[key]
+
+    def to_xml(self):
+        """Return contents of styles.xml."""
+
+        fonts = _Table()
+        fills = _Table()
+        borders = _Table()
+        number_formats = _Table()
+
+        fills.index('<fill><patternFill patternType="none"/></fill>')
+        fills.index('<fill><patternFill patternType="gray125"/></fill>')
+
+        formats = []
+        for style in self._records:
+            formats.append(
+                '<xf numFmtId="%d" fontId="%d" fillId="%d" borderId="%d" '
+                'xfId="0" applyNumberFormat="1" applyFont="1" applyFill="1" '
+                'applyBorder="1" applyAlignment="1">%s</xf>' % (
+                    _number_format_id(style.num_format_str, number_formats),
+                    fonts.index(_font_xml(style.font)),
+                    fills.index(_fill_xml(style.pattern)),
+                    borders.index(_border_xml(style.borders)),
+                    _alignment_xml(style.alignment)))
+
+        custom_formats = ''
+        if number_formats.items:
+            custom_formats = '<numFmts count="%d">%s</numFmts>' % (
+                len(number_formats.items),
+                ''.join('<numFmt numFmtId="%d" formatCode=%s/>' %
+                        (164 + i, quoteattr(_encode(x)))
+                        for i, x in enumerate(number_formats.items)))
+
+        return (_XML_HEADER +
+                '<styleSheet xmlns="%s">' % _NAMESPACE +
+                custom_formats +
+                fonts.to_xml('fonts') +
+                fills.to_xml('fills') +
+                borders.to_xml('borders') +
+                '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" '
+                'fillId="0" borderId="0"/></cellStyleXfs>' +
+                '<cellXfs count="%d">%s</cellXfs>' %
+                (len(formats), ''.join(formats)) +
+                '<cellStyles count="1"><cellStyle name="Normal" xfId="0" '
+                'builtinId="0"/></cellStyles>' +
+                '</styleSheet>')
+
+
+class _Table(object):
+    """Ordered collection of unique XML snippets."""
+
+    def __init__(self):
+        self.items = []
+        self._indices = {}
+
+    def index(self, item):
+        if item not in self._indices:
+            self._indices[item] = len(self.items)
+            self.items.append(item)
+        return self._indices[item]
+
+    def to_xml(self, tag):
+        return '<%s count="%d">%s</%s>' % (tag,
+                                           len(self.items),
+                                           ''.join(self.items),
+                                           tag)
+
+
+def _number_format_id(format_string, custom_formats):
+    if format_string in _BUILTIN_NUMBER_FORMATS:
+        return _BUILTIN_NUMBER_FORMATS[format_string]
+    return 164 + custom_formats.index(format_string)
+
+
+def _font_xml(font):
+
+    xml = '<font>'
+
+    if font.bold:
+        xml += '<b/>'
+
+    if font.italic:
+        xml += '<i/>'
+
+    xml += '<sz val="%g"/>' % (font.height / 20.0)
+
+    if font.colour_index != _AUTOMATIC_COLOUR:
+        xml += '<color indexed="%d"/>' % font.colour_index
+
+    xml += '<name val=%s/>' % quoteattr(_encode(font.name))
+
+    return xml + '</font>'
+
+
+def _fill_xml(pattern):
+
+    if pattern.pattern == xlwt.Pattern.NO_PATTERN:
+        return '<fill><patternFill patternType="none"/></fill>'
+
+    return ('<fill><patternFill patternType="solid">'
+            '<fgColor indexed="%d"/><bgColor indexed="%d"/>'
+            '</patternFill></fill>' % (pattern.pattern_fore_colour,
+                                       pattern.pattern_back_colour))
+
+
+def _border_xml(borders):
+
+    xml = '<border>'
+
+    for side in ('left', 'right', 'top', 'bottom'):
+
+        line_style = _BORDER_STYLES.get(getattr(borders, side))
+
+        if line_style:
+            xml += '<%s style="%s"><color indexed="%d"/></%s>' % (
+                side, line_style, getattr(borders, side + '_colour'), side)
+        else:
+            xml += '<%s/>' % side
+
+    return xml + '<diagonal/></border>'
+
+
+def _alignment_xml(alignment):
+    if alignment.horz in _HORIZONTAL_ALIGNMENT:
+        return '<alignment horizontal="%s"/>' % \
+            _HORIZONTAL_ALIGNMENT[alignment.horz]
+    return ''
+
+
+def _row_xml(row, cells):
+    """Return XML of a row with cells given as {col: (label, style)}."""
+
+    xml = ['<row r="%d">' % (row + 1)]
+
+    for col in sorted(cells):
+
+        label, style = cells[col]
+        ref = _cell_reference(row, col)
+
+        if label is None:
+            xml.append('<c r="%s" s="%d"/>' % (ref, style))
+        elif isinstance(label, bool):
+            xml.append('<c r="%s" s="%d" t="b"><v>%d</v></c>' %
+                       (ref, style, label))
+        elif isinstance(label, numbers.Number):
+            xml.append('<c r="%s" s="%d"><v>%r</v></c>' %
+                       (ref, style, float(label)))
+        else:
+            xml.append('<c r="%s" s="%d" t="inlineStr"><is>'
+                       '<t xml:space="preserve">%s</t></is></c>' %
+                       (ref, style, escape(_encode(label))))
+
+    xml.append('</row>')
+
+    return ''.join(xml)
+
+
+def _cell_reference(row, col):
+    """Return A1-style reference of a zero-based cell address."""
+
+    if col not in _COLUMN_LETTERS:
+
+        letters = ''
+        index = col + 1
+        while index > 0:
+            index, remainder = divmod(index - 1, 26)
+            letters = chr(65 + remainder) + letters
+
+        _COLUMN_LETTERS[col] = letters
+
+    return '%s%d' % (_COLUMN_LETTERS[col], row + 1)
+
+
+_COLUMN_LETTERS = {}
+
+
+def _encode(text):
+    """Return UTF-8 encoded string."""
+    if isinstance(text, unicode):
+        return text.encode('utf-8')
+    return str(text)
+
+
+def _root_relationships():
+    return (_XML_HEADER +
+            '<Relationships xmlns="%s">'
+            '<Relationship Id="rId1" Type="%s/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>' %
+            (_PACKAGE_RELATIONSHIPS, _RELATIONSHIPS))
@@ -83,106 +83,67 @@ Excerpt from a sample result:
         }
     ]
 }
-"""
-
-import os
-import re
-import sys
-import json
-import time
-import datetime
-import xlrd
-
-from microanalyst.commons import uniutils
-
-
-def is_valid(sheet):
-    """Check if worksheet conforms to Tecan(R) i-control(TM) format."""
-    if sheet.nrows >= 36 and sheet.ncols >= 13:
-        signature = 'Application: Tecan i-control'
-        return sheet.cell_value(0, 0) == signature
-
-
-def parse_datetime(text):
-    """Return date and time according to ISO 8601 standard."""
-    tm_struct = time.strptime(text, '%Y-%m-%d %H:%M:%S')
-    iso8601 = datetime.datetime(*tm_struct[0:6]).isoformat()
-    return uniutils.str2unicode(iso8601)
-
 
-def parse_temperature(text):
-    """Return temperature in Celsius degrees."""
-    match = re.search(ur'\s([^\s]+)\s', text)
-    return float(match.group(1)) if match else None
+Reading spreadsheets is CPU bound, therefore, it can be spread across
+several processes with the optional "--jobs" parameter, e.g.
+$ (...) | assemble.py --jobs 4
 
+The time spent on reading each file is then reported on stderr.
 
-def get_well_values(sheet):
-    """Return a list of well values in row-major order."""
+Parsed spreadsheets are cached on disk under a digest of their contents,
+so that re-running an experiment only reads new or modified files:
+$ (...) | assemble.py --cache-dir /tmp/cache --cache-size 64
+$ (...) | assemble.py --no-cache
 
-    values = []
-    for row in xrange(24, 32):
-        for col in xrange(1, 13):
-            values.append(float(sheet.cell_value(row, col)))
-
-    return values
-
-
-def get_microplates(filename):
-    """Return microplates and their values for a given filename."""
-
-    microplates = {}
-
-    workbook = xlrd.open_workbook(filename)
-    for sheet in workbook.sheets():
-        if is_valid(sheet):
-            microplates[sheet.name] = {
-                u'timestamp': parse_datetime(sheet.cell_value(20, 1)),
-                u'temperature': parse_temperature(sheet.cell_value(22, 1)),
-                u'values': get_well_values(sheet)
-            }
-
-    return microplates
+Workbooks with many or large extra worksheets (e.g. charts or summaries)
+can be read one worksheet at a time to keep memory usage flat:
+$ (...) | assemble.py --on-demand
+"""
 
+import sys
+import json
+import argparse
 
-def date2str(iso8601):
-    """Return only the date portion of an ISO 8601 datetime."""
-    match = re.search(ur'([^T]+)T', iso8601)
-    return match.group(1) if match else None
+from microanalyst import pipeline
+from microanalyst.commons import jsonutils, uniutils
+from microanalyst.xls import cache
 
 
-def earliest(microplates):
-    """Return the earliest timestamp of the microplates in a single file."""
-    timestamps = [date2str(microplates[x][u'timestamp']) for x in microplates]
-    timestamps.sort()
-    return timestamps[0]
+def parse(args):
+    """[--jobs <int>] [--on-demand] [--compact]
+       [--no-cache] [--cache-dir <dir>] [--cache-size <MB>]
+    """
 
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', metavar='N', type=int, default=1,
+                        help='number of worker processes (0 for all cores)')
+    parser.add_argument('--on-demand', action='store_true', default=False,
+                        help='load one worksheet at a time to save memory')
+    parser.add_argument('--compact', action='store_true', default=None)
+    parser.add_argument('--no-cache', action='store_true', default=False)
+    parser.add_argument('--cache-dir', metavar='dir')
+    parser.add_argument('--cache-size', metavar='MB', type=int,
+                        default=cache.DEFAULT_MAX_SIZE // (1024 * 1024))
 
-def main():
+    return parser.parse_args(args)
 
-    json_data = json.loads(u''.join(uniutils.stdin()))
 
-    for iteration in json_data:
+def main(args):
 
-        files = iteration[u'files']
-        for i, filename in enumerate(files):
-            files[i] = {
-                u'filename': os.path.abspath(filename),
-                u'microplates': get_microplates(filename)
-            }
+    params = parse(args)
 
-        # ISO 8601 dates can be sorted lexicographically
-        files.sort(key = lambda x: earliest(x[u'microplates']))
+    json_data = json.loads(uniutils.read_stdin())
 
-        # rename "files" to "spreadsheets"
-        iteration[u'spreadsheets'] = iteration.pop(u'files')
+    json_data = pipeline.assemble(json_data,
+                                  pipeline.get_reader(params),
+                                  params.jobs,
+                                  pipeline.get_cache(params))
 
-    print json.dumps({'iterations': json_data},
-                     indent=4,
-                     sort_keys=True)
+    jsonutils.dump(json_data, compact=params.compact)
 
 
 if __name__ == '__main__':
     try:
-        main()
+        main(sys.argv[1:])
     except KeyboardInterrupt:
         print >> sys.stderr, 'Aborted'
@@ -69,17 +69,20 @@ C:\\> (...) | control.py - - series3/ctrl.json -
 
 import sys
 import json
+import argparse
 
-from microanalyst.commons import osutils, uniutils
+from microanalyst import pipeline
+from microanalyst.commons import jsonutils, osutils, uniutils
 
 
 def parse(args):
-    return osutils.expand(uniutils.argv(args))
+    """filename [filename ...] [--compact]"""
 
+    parser = argparse.ArgumentParser()
+    parser.add_argument('filenames', metavar='filename', nargs='*')
+    parser.add_argument('--compact', action='store_true', default=None)
 
-def load_json(filename):
-    with open(filename, 'r') as file_handle:
-        return json.load(file_handle)
+    return parser.parse_args(args)
 
 
 def main(args):
@@ -88,26 +91,17 @@ def main(args):
         print 'usage: (...) | control.py filename [filename ...]'
     else:
 
-        json_data = json.loads(u''.join(uniutils.stdin()))
+        params = parse(args)
+        json_data = json.loads(uniutils.read_stdin())
 
-        if len(json_data) != len(args):
-            template = 'JSON array has %d items but %d argument(s) provided'
-            print template % (len(json_data), len(args))
+        try:
+            pipeline.control(json_data,
+                             osutils.expand(uniutils.argv(params.filenames)))
+        except ValueError as ex:
+            print ex
             sys.exit(1)
 
-        for i, filename in enumerate(parse(args)):
-
-            if filename == '-':
-                message = 'Warning: control wells for iteration #%d not provided'
-                print >> sys.stderr, message % (i + 1)
-                continue
-
-            if u'control' in json_data[i]:
-                print >> sys.stderr, 'Warning: "control" property overwritten'
-
-            json_data[i][u'control'] = load_json(filename)
-
-        print json.dumps(json_data, indent=4, sort_keys=True)
+        jsonutils.dump(json_data, compact=params.compact)
 
 
 if __name__ == '__main__':
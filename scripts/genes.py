@@ -28,17 +28,20 @@ Append "genes" property to a JSON dictionary.
 
 import sys
 import json
+import argparse
 
-from microanalyst.commons import osutils, uniutils
+from microanalyst import pipeline
+from microanalyst.commons import jsonutils, osutils, uniutils
 
 
 def parse(args):
-    return osutils.expand(uniutils.argv(args))[0]
+    """filename [--compact]"""
 
+    parser = argparse.ArgumentParser()
+    parser.add_argument('filename')
+    parser.add_argument('--compact', action='store_true', default=None)
 
-def load_json(filename):
-    with open(filename, 'r') as file_handle:
-        return json.load(file_handle)
+    return parser.parse_args(args)
 
 
 def main(args):
@@ -46,13 +49,15 @@ def main(args):
     if sys.stdin.isatty():
         print 'usage: (...) | genes.py filename'
     else:
-        json_data = json.loads(u''.join(uniutils.stdin()))
+        params = parse(args)
+        json_data = json.loads(uniutils.read_stdin())
 
-        if type(json_data) is dict:
-            json_data[u'genes'] = load_json(parse(args))
-            print json.dumps(json_data, indent=4, sort_keys=True)
-        else:
-            print >> sys.stderr, 'The root element of JSON input must be an object but got: %s' % type(json_data)
+        try:
+            filename = osutils.expand(uniutils.argv([params.filename]))[0]
+            pipeline.genes(json_data, filename)
+            jsonutils.dump(json_data, compact=params.compact)
+        except TypeError as ex:
+            print >> sys.stderr, ex
 
 
 if __name__ == '__main__':
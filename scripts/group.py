@@ -45,7 +45,9 @@ Cluster annotations are optional. They can take arbitrary names except
 for "files" which is ignored to avoid shadowing of the reserved key.
 Annotations must be prefixed with at least one dash character "-" and
 be followed by a space and a value. If specified annotations must be
-places after filenames.
+places after filenames. Therefore, unlike other scripts, this one has
+no "--compact" flag and prints minified JSON only when the
+MICROANALYST_COMPACT environment variable is set.
 
 Pipes allow for concatenation of multiple clusters, e.g.
 $ group.py folder1/* | group.py folder2/*
@@ -71,7 +73,8 @@ import sys
 import json
 import argparse
 
-from microanalyst.commons import osutils, uniutils
+from microanalyst import pipeline
+from microanalyst.commons import jsonutils, uniutils
 
 
 def parse(args):
@@ -104,20 +107,20 @@ def list2dict(sequence):
 
 
 def make_cluster(filenames, annotations):
-    cluster = list2dict(annotations)
-    cluster[u'files'] = osutils.expand(filenames)
-    return cluster
+    return pipeline.group(filenames, list2dict(annotations))
 
 
 def main(args):
 
-    array = [make_cluster(*parse(args))]
+    filenames, annotations = parse(args)
+
+    array = [make_cluster(filenames, annotations)]
 
     if not sys.stdin.isatty():
-        pipe = json.loads(u''.join(uniutils.stdin()))
+        pipe = json.loads(uniutils.read_stdin())
         array = pipe + array
 
-    print json.dumps(array, indent=4)
+    jsonutils.dump(array, sort_keys=False)
 
 
 if __name__ == '__main__':
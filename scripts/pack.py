@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Save experiment data in JSON format produced by the assemble.py script
+to a directory in the native binary format, which loads much faster.
+
+Sample usage:
+$ cat experiment.json | pack.py experiment
+
+The reverse conversion is done with the unpack.py script.
+"""
+
+import sys
+
+import microanalyst.model
+
+from microanalyst.commons import osutils, uniutils
+
+
+def parse(args):
+    return osutils.expand(uniutils.argv(args))[0]
+
+
+def main(args):
+
+    if sys.stdin.isatty() or len(args) != 1:
+        print 'usage: (...) | pack.py dirname'
+    else:
+        model = microanalyst.model.Model.loads(uniutils.read_stdin())
+        model.save(parse(args))
+
+
+if __name__ == '__main__':
+    try:
+        main(sys.argv[1:])
+    except KeyboardInterrupt:
+        print >> sys.stderr, 'Aborted'
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Run the whole processing pipeline in a single process and open the result.
+
+Equivalent of chaining the scripts with pipes, e.g.
+$ group.py series1/*.xls | group.py series2/*.xls |
+  control.py series1/ctrl.json - | assemble.py | genes.py genes.json |
+  xlsv.py output.xls
+
+but without starting a new interpreter and re-parsing the intermediate
+JSON at each stage:
+$ pipeline.py output.xls --iteration series1/*.xls --control series1/ctrl.json
+  --iteration series2/*.xls --control - --genes genes.json --layout vertical
+
+Control wells, if given, must be defined for each iteration in the same
+order. Use a dash character "-" to explicitly omit certain iterations.
+
+The intermediate JSON can be kept with the "--json" parameter, optionally
+minified with the "--compact" flag:
+$ pipeline.py output.xlsx --iteration *.xls --json experiment.json
+"""
+
+import os
+import sys
+import argparse
+
+from microanalyst import pipeline
+from microanalyst.commons import osutils, uniutils
+from microanalyst.xls import cache, exporter
+
+
+def parse(args):
+    """<file.xls[x]> --iteration <file> [<file> ...] [--control <file>]
+       [--genes <file>] [--layout horizontal|vertical]
+       [--json <file>] [--compact]
+       [-f] [--binary] [--colors] [--stylesheet <file.css>] [--jobs <N>]
+       [--on-demand] [--no-cache] [--cache-dir <dir>] [--cache-size <MB>]
+    """
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('filename')
+    parser.add_argument('--iteration', metavar='file', nargs='+',
+                        action='append', required=True)
+    parser.add_argument('--control', metavar='file', action='append')
+    parser.add_argument('--genes', metavar='file')
+    parser.add_argument('--layout', choices=sorted(pipeline.LAYOUTS),
+                        default='horizontal')
+    parser.add_argument('--json', metavar='file')
+    parser.add_argument('--compact', action='store_true', default=None)
+    parser.add_argument('-f', '--force-overwrite', action='store_true')
+    parser.add_argument('--stylesheet', metavar='style.css')
+    parser.add_argument('--colors', action='store_true', default=False)
+    parser.add_argument('--binary', action='store_true', default=False)
+    parser.add_argument('--jobs', metavar='N', type=int, default=1,
+                        help='number of worker processes (0 for all cores) '
+                             'reading spreadsheets and rendering .xlsx files')
+    parser.add_argument('--on-demand', action='store_true', default=False,
+                        help='load one worksheet at a time to save memory')
+    parser.add_argument('--no-cache', action='store_true', default=False)
+    parser.add_argument('--cache-dir', metavar='dir')
+    parser.add_argument('--cache-size', metavar='MB', type=int,
+                        default=cache.DEFAULT_MAX_SIZE // (1024 * 1024))
+
+    return parser.parse_args(args)
+
+
+def main(args):
+
+    params = parse(args)
+    filename = uniutils.argv([params.filename])[0]
+
+    if os.path.exists(filename) and not params.force_overwrite:
+        print 'File already exists. Use the -f flag to force overwrite.'
+        return
+
+    iterations = [pipeline.group(uniutils.argv(x)) for x in params.iteration]
+
+    if params.control:
+        try:
+            pipeline.control(iterations,
+                             osutils.expand(uniutils.argv(params.control)))
+        except ValueError as ex:
+            print ex
+            sys.exit(1)
+
+    print '[1/2] Reading spreadsheets...',
+    json_data = pipeline.assemble(iterations,
+                                  pipeline.get_reader(params),
+                                  params.jobs,
+                                  pipeline.get_cache(params))
+    print 'done'
+
+    if params.genes:
+        genes_filename = osutils.expand(uniutils.argv([params.genes]))[0]
+        pipeline.genes(json_data, genes_filename)
+
+    if params.json:
+        pipeline.save_json(json_data,
+                           uniutils.argv([params.json])[0],
+                           params.compact)
+
+    print '[2/2] Rendering...',
+    pipeline.export(json_data,
+                    filename,
+                    params.layout,
+                    params.stylesheet,
+                    params.colors,
+                    params.binary,
+                    params.jobs if exporter.is_xlsx(filename) else 1)
+    print 'done'
+
+    osutils.open_with_default_app(filename)
+
+
+if __name__ == '__main__':
+    try:
+        main(sys.argv[1:])
+    except KeyboardInterrupt:
+        print >> sys.stderr, 'Aborted'
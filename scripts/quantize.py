@@ -37,54 +37,72 @@ $ ... | quantize.py --starved 0 --control 1 --other 1
 """
 
 import sys
-import json
 import argparse
 import numpy
 
 import microanalyst.model
 
-from microanalyst.model import thresholds
-from microanalyst.commons import uniutils
+from microanalyst.model import storage, thresholds
+from microanalyst.commons import jsonutils, uniutils
 
 
 def parse(args):
-    """[--starved <int>] [--control <int>] [--other <int>]"""
+    """[--starved <int>] [--control <int>] [--other <int>] [--compact]"""
 
     parser = argparse.ArgumentParser()
     parser.add_argument('--control', metavar='level', type=int, default=2)
     parser.add_argument('--other', metavar='level', type=int, default=1)
     parser.add_argument('--starved', metavar='level', type=int, default=0)
+    parser.add_argument('--compact', action='store_true', default=None)
 
     return parser.parse_args(args)
 
 
-def quantize_control_wells(model, levels):
-    """Replace control well values with a constant."""
-    model.values()[model.control_mask.values] = levels.control
+def quantize(model, levels):
+    """Replace values of all wells with relevant constants in one pass.
 
+    Threshold expressions are evaluated against the whole array at once.
+    Missing wells (NaN) are left intact.
+    """
 
-def quantize_non_control_wells(model, levels):
-    """Replace values of wells other than controls with relevant constants."""
+    values = model.values()
 
-    levels = {
-        True: levels.starved,
-        False: levels.other
-    }
+    if values is None:
+        return
 
     is_starved = thresholds.Thresholds().starvation()
-    set_level = numpy.vectorize(lambda x: levels[is_starved(x)])
 
-    model.values()[~model.control_mask.values] = set_level(
-        model.values()[~model.control_mask.values]
-    )
+    with numpy.errstate(invalid='ignore'):
+        starved = numpy.asarray(is_starved.apply(values), dtype=numpy.bool_)
+
+    missing = numpy.isnan(values)
+    control = model.control_mask.values
+
+    values.fill(levels.other)
+    values[starved] = levels.starved
+    values[control] = levels.control
+    values[missing] = numpy.nan
 
 
 def update(json_data, model):
     """Update JSON with quantized values from the model."""
+
+    values = model.values()
+
+    if values is None:
+        return
+
+    # convert to Python ints once rather than cell by cell
+    with numpy.errstate(invalid='ignore'):
+        levels = values.astype(numpy.int64).astype(object)
+        levels[numpy.isnan(values)] = None
+
+    indexof = {x: i for i, x in enumerate(model.microplate_names())}
+
     for i, iteration in enumerate(json_data[u'iterations']):
         for j, spreadsheet in enumerate(iteration[u'spreadsheets']):
             for name, microplate in spreadsheet[u'microplates'].items():
-                microplate[u'values'] = [int(x) for x in model.values(i, j, name)]
+                microplate[u'values'] = levels[i, j, indexof[name]].tolist()
 
 
 def main(args):
@@ -93,17 +111,16 @@ def main(args):
         print 'usage: (...) | assemble.py | quantize.py'
     else:
 
-        json_data = json.loads(u''.join(uniutils.stdin()))
         levels = parse(args)
 
-        model = microanalyst.model.Model(json_data)
+        model = microanalyst.model.Model.loads(uniutils.read_stdin())
 
-        quantize_control_wells(model, levels)
-        quantize_non_control_wells(model, levels)
+        quantize(model, levels)
 
+        json_data = storage.strip_values(model.json_data)
         update(json_data, model)
 
-        print json.dumps(json_data, indent=4, sort_keys=True)
+        jsonutils.dump(json_data, compact=levels.compact)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Print experiment data saved with the pack.py script in JSON format.
+
+Sample usage:
+$ unpack.py experiment | xlsv.py output.xls
+"""
+
+import sys
+import argparse
+
+import microanalyst.model
+
+from microanalyst.commons import jsonutils, osutils, uniutils
+from microanalyst.model import storage
+
+
+def parse(args):
+    """dirname [--compact]"""
+
+    parser = argparse.ArgumentParser(usage='unpack.py dirname [--compact]')
+    parser.add_argument('dirname')
+    parser.add_argument('--compact', action='store_true', default=None)
+
+    return parser.parse_args(args)
+
+
+def main(args):
+
+    params = parse(args)
+    dirname = osutils.expand(uniutils.argv([params.dirname]))[0]
+
+    model = microanalyst.model.Model.open(dirname)
+    jsonutils.dump(storage.to_json(model), compact=params.compact)
+
+
+if __name__ == '__main__':
+    try:
+        main(sys.argv[1:])
+    except KeyboardInterrupt:
+        print >> sys.stderr, 'Aborted'
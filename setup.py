@@ -75,7 +75,10 @@ setup(name=u'microanalyst',
           'scripts/genes.py',
           'scripts/assemble.py',
           'scripts/quantize.py',
+          'scripts/pack.py',
+          'scripts/unpack.py',
           'scripts/xlsh.py',
           'scripts/xlsv.py',
+          'scripts/pipeline.py',
           'scripts/manalyst.pyw'
       ])
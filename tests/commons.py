@@ -24,8 +24,15 @@
 
 import unittest
 import platform
+import contextlib
 import subprocess
 
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from random import random
 from subprocess import Popen
 from microanalyst.commons import uniutils
 
@@ -87,5 +94,71 @@ class ScriptTestCase(unittest.TestCase):
         self.skipTest("Unicode cannot be represented with platform's charset: %s" % encoding)
 
 
+@contextlib.contextmanager
+def open_files_limit(limit):
+    """Temporarily lower the limit of open file descriptors."""
+
+    if resource is None:
+        raise unittest.SkipTest('Cannot limit open files on this platform')
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+
+def make_json_data(*iterations, **annotations):
+    """Return JSON data model with consecutively numbered filenames.
+
+    Each iteration is a list of spreadsheets mapping microplate names to
+    their values, or to None for random values. Control wells are keyed
+    by a tuple with the index of an iteration, or of an iteration and a
+    spreadsheet. Remaining keyword arguments are put in the root element
+    as is.
+    """
+
+    control = annotations.pop('control', {})
+
+    result = dict(annotations)
+    result['iterations'] = []
+
+    for i, spreadsheets in enumerate(iterations):
+
+        iteration = {'spreadsheets': []}
+        if (i,) in control:
+            iteration['control'] = control[(i,)]
+
+        for j, microplates in enumerate(spreadsheets):
+
+            spreadsheet = {
+                'filename': 'iteration%d/spreadsheet%d.xls' % (i+1, j+1),
+                'microplates': {
+                    name: microplate(values)
+                    for name, values in microplates.iteritems()
+                }
+            }
+
+            if (i, j) in control:
+                spreadsheet['control'] = control[(i, j)]
+
+            iteration['spreadsheets'].append(spreadsheet)
+
+        result['iterations'].append(iteration)
+
+    return result
+
+
+def microplate(values=None):
+    """Return microplate with given values or random ones if None."""
+    return {
+        'temperature': 23.6,
+        'timestamp': '2014-01-13T12:43:19',
+        'values': [random() for i in xrange(96)] if values is None else values
+    }
+
+
 def normalize(text):
     return text.replace('\r', '').strip()
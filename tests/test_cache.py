@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from microanalyst.xls import cache
+from microanalyst.commons.osutils import TempFile
+
+
+class TestSerialization(unittest.TestCase):
+
+    def test_round_trip(self):
+
+        # given
+        microplates = get_microplates()
+
+        # when
+        actual = cache.loads(cache.dumps(microplates))
+
+        # then
+        self.assertDictEqual(microplates, actual)
+
+    def test_retain_missing_temperature(self):
+
+        # given
+        microplates = get_microplates()
+        microplates[u'001'][u'temperature'] = None
+
+        # when
+        actual = cache.loads(cache.dumps(microplates))
+
+        # then
+        self.assertIsNone(actual[u'001'][u'temperature'])
+
+    def test_retain_unicode_names(self):
+
+        # given
+        name = u'za\u017c\xf3\u0142\u0107'
+        microplates = {name: get_microplates()[u'001']}
+
+        # when
+        actual = cache.loads(cache.dumps(microplates))
+
+        # then
+        self.assertListEqual([name], actual.keys())
+
+    def test_reject_truncated_data(self):
+        data = cache.dumps(get_microplates())
+        with self.assertRaises(Exception):
+            cache.loads(data[:-1])
+
+    def test_reject_other_parser_version(self):
+
+        # given
+        data = cache.dumps(get_microplates())
+
+        # when
+        data = data[:4] + chr(cache.PARSER_VERSION + 1) + data[5:]
+
+        # then
+        with self.assertRaises(ValueError):
+            cache.loads(data)
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def test_call_reader_only_once_for_the_same_contents(self):
+
+        with TempFile() as tmp:
+
+            # given
+            tmp.write('contents')
+            reader = Reader()
+            parse_cache = cache.Cache(self.dirname)
+
+            # when
+            copy1 = parse_cache.get(tmp.name(), reader)
+            copy2 = parse_cache.get(tmp.name(), reader)
+
+            # then
+            self.assertEqual(1, reader.num_calls)
+            self.assertDictEqual(copy1, copy2)
+
+    def test_call_reader_again_when_contents_change(self):
+
+        with TempFile() as tmp1, TempFile() as tmp2:
+
+            # given
+            tmp1.write('contents')
+            tmp2.write('other contents')
+            reader = Reader()
+            parse_cache = cache.Cache(self.dirname)
+
+            # when
+            parse_cache.get(tmp1.name(), reader)
+            parse_cache.get(tmp2.name(), reader)
+
+            # then
+            self.assertEqual(2, reader.num_calls)
+
+    def test_share_entries_between_files_with_the_same_contents(self):
+
+        with TempFile() as tmp1, TempFile() as tmp2:
+
+            # given
+            tmp1.write('contents')
+            tmp2.write('contents')
+            reader = Reader()
+            parse_cache = cache.Cache(self.dirname)
+
+            # when
+            parse_cache.get(tmp1.name(), reader)
+            parse_cache.get(tmp2.name(), reader)
+
+            # then
+            self.assertEqual(1, reader.num_calls)
+
+    def test_evict_least_recently_used_entries(self):
+
+        # given
+        entry_size = len(cache.dumps(get_microplates()))
+        parse_cache = cache.Cache(self.dirname, max_size=2 * entry_size)
+
+        filenames = []
+        for i in xrange(3):
+            path = os.path.join(self.dirname, '.file%d' % i)
+            with open(path, 'wb') as file_handle:
+                file_handle.write('contents %d' % i)
+            filenames.append(path)
+
+        reader = Reader()
+
+        # when
+        parse_cache.get(filenames[0], reader)
+        parse_cache.get(filenames[1], reader)
+        _set_mtime(parse_cache, filenames[0], 1)
+        _set_mtime(parse_cache, filenames[1], 2)
+        parse_cache.get(filenames[2], reader)
+
+        # then
+        self.assertEqual(2 * entry_size, parse_cache.size())
+        self.assertFalse(_is_cached(parse_cache, filenames[0]))
+        self.assertTrue(_is_cached(parse_cache, filenames[1]))
+        self.assertTrue(_is_cached(parse_cache, filenames[2]))
+
+    def test_ignore_corrupted_entries(self):
+
+        with TempFile() as tmp:
+
+            # given
+            tmp.write('contents')
+            reader = Reader()
+            parse_cache = cache.Cache(self.dirname)
+            parse_cache.get(tmp.name(), reader)
+
+            # when
+            path = os.path.join(self.dirname, cache.digest(tmp.name()))
+            with open(path, 'wb') as file_handle:
+                file_handle.write('garbage')
+
+            actual = parse_cache.get(tmp.name(), reader)
+
+            # then
+            self.assertEqual(2, reader.num_calls)
+            self.assertDictEqual(get_microplates(), actual)
+
+
+class Reader(object):
+    """Stub of a spreadsheet reader counting its invocations."""
+
+    def __init__(self):
+        self.num_calls = 0
+
+    def __call__(self, filename):
+        self.num_calls += 1
+        return get_microplates()
+
+
+def get_microplates():
+    return {
+        u'001': {
+            u'temperature': 23.6,
+            u'timestamp': u'2014-01-13T12:43:19',
+            u'values': [i / 96.0 for i in xrange(96)]
+        },
+        u'002': {
+            u'temperature': 23.7,
+            u'timestamp': u'2014-01-13T12:45:02',
+            u'values': [1.0 - i / 96.0 for i in xrange(96)]
+        }
+    }
+
+
+def _is_cached(parse_cache, filename):
+    return os.path.exists(os.path.join(parse_cache.dirname,
+                                       cache.digest(filename)))
+
+
+def _set_mtime(parse_cache, filename, mtime):
+    path = os.path.join(parse_cache.dirname, cache.digest(filename))
+    os.utime(path, (mtime, mtime))
+
+
+if __name__ == '__main__':
+    unittest.main()
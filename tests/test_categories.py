@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import unittest
+import numpy
+
+from microanalyst.model import Model, categories
+from commons import make_json_data
+
+
+class TestCategories(unittest.TestCase):
+
+    def test_classify_by_default_thresholds(self):
+
+        # given
+        values = numpy.array([0.1, 0.5, 0.9])
+
+        # when
+        actual = categories.classify(values, numpy.zeros(3, dtype=bool))
+
+        # then
+        self.assertListEqual([categories.STARVED,
+                              categories.NORMAL,
+                              categories.INFECTED], actual.tolist())
+
+    def test_classify_control_wells(self):
+
+        # given
+        values = numpy.array([0.05, 0.5, 0.5])
+        control_mask = numpy.array([True, True, False])
+
+        # when
+        actual = categories.classify(values, control_mask)
+
+        # then
+        self.assertListEqual([categories.CONTROL,
+                              categories.VIOLATED,
+                              categories.NORMAL], actual.tolist())
+
+    def test_classify_missing_wells(self):
+
+        # given
+        values = numpy.array([numpy.nan, numpy.nan])
+        control_mask = numpy.array([True, False])
+
+        # when
+        actual = categories.classify(values, control_mask)
+
+        # then
+        self.assertListEqual([categories.MISSING] * 2, actual.tolist())
+
+    def test_return_int8_array(self):
+
+        # when
+        actual = categories.classify(numpy.zeros((2, 3)), None)
+
+        # then
+        self.assertEqual(numpy.int8, actual.dtype)
+        self.assertEqual((2, 3), actual.shape)
+
+    def test_return_none_for_no_values(self):
+        self.assertIsNone(categories.classify(None, None))
+
+    def test_model_categories(self):
+
+        # given
+        model = Model(get_json_data())
+
+        # when
+        actual = model.categories(microplate='001', well='A1')
+
+        # then
+        self.assertListEqual([[categories.CONTROL, categories.VIOLATED],
+                              [categories.MISSING, categories.MISSING]],
+                             actual.tolist())
+
+    def test_model_categories_scalar(self):
+
+        # given
+        model = Model(get_json_data())
+
+        # when
+        actual = model.categories(0, 1, '001', 'A2')
+
+        # then
+        self.assertEqual(categories.INFECTED, actual)
+
+    def test_recompute_after_values_replaced(self):
+
+        # given
+        model = Model(get_json_data())
+        model.categories()
+
+        # when
+        model.array4d = numpy.zeros(model.array4d.shape)
+
+        # then
+        self.assertEqual(categories.STARVED, model.categories(0, 1, '001', 'A2'))
+
+
+def get_json_data():
+
+    def values(first, second):
+        return [first, second] + [0.5] * 94
+
+    return make_json_data(
+        [{'001': values(0.05, 0.5)}, {'001': values(0.1, 0.9)}],
+        [{}],
+        control={(0,): {'001': ['A1']}})
+
+
+if __name__ == '__main__':
+    unittest.main()
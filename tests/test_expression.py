@@ -23,6 +23,7 @@
 # THE SOFTWARE.
 
 import unittest
+import numpy
 
 from microanalyst.model.expression import Expression
 
@@ -112,5 +113,83 @@ class TestEvaluation(unittest.TestCase):
         self.assertEqual(factorial(6), 720)
 
 
+class TestArrayEvaluation(unittest.TestCase):
+
+    def test_comparison(self):
+        is_starved = Expression('x <= 0.2')
+        actual = is_starved.apply(numpy.array([0.1, 0.2, 0.3]))
+        self.assertListEqual([True, True, False], actual.tolist())
+
+    def test_arithmetic(self):
+        polynomial = Expression('-x**2 + 2*x + 3')
+        actual = polynomial.apply(numpy.arange(3))
+        self.assertListEqual([3, 4, 3], actual.tolist())
+
+    def test_boolean_operators(self):
+        expr = Expression('x < 1 or x > 2 and not x == 4')
+        actual = expr.apply(numpy.arange(6))
+        self.assertListEqual([True, False, False, True, False, True],
+                             actual.tolist())
+
+    def test_chained_comparison(self):
+        expr = Expression('1 <= x < 3')
+        actual = expr.apply(numpy.arange(5))
+        self.assertListEqual([False, True, True, False, False],
+                             actual.tolist())
+
+    def test_conditional_expression(self):
+        expr = Expression('x if x > 1 else -x')
+        actual = expr.apply(numpy.arange(4))
+        self.assertListEqual([0, -1, 2, 3], actual.tolist())
+
+    def test_multiple_parameters(self):
+        expr = Expression('a < b', params=('b', 'a'))
+        actual = expr.apply(numpy.array([1, 2]), numpy.array([2, 1]))
+        self.assertListEqual([False, True], actual.tolist())
+
+    def test_nested_expression(self):
+        is_even = Expression('x % 2 == 0')
+        is_odd = Expression('not is_even(x)', locals())
+        actual = is_odd.apply(numpy.arange(4))
+        self.assertListEqual([False, True, False, True], actual.tolist())
+
+    def test_builtins(self):
+        expr = Expression('abs(x) > 1')
+        actual = expr.apply(numpy.array([-2, 0, 2]))
+        self.assertListEqual([True, False, True], actual.tolist())
+
+    def test_nan_is_never_matched(self):
+        is_starved = Expression('x <= 0.2')
+        with numpy.errstate(invalid='ignore'):
+            actual = is_starved.apply(numpy.array([numpy.nan]))
+        self.assertListEqual([False], actual.tolist())
+
+    def test_same_result_as_scalar(self):
+        expr = Expression('0.2 < x < 0.8 or not x > 0.1')
+        values = numpy.linspace(0, 1, 11)
+        expected = [expr(x) for x in values]
+        self.assertListEqual(expected, expr.apply(values).tolist())
+
+    def test_reject_attribute_access(self):
+        expr = Expression('x.real > 0')
+        with self.assertRaises(ValueError):
+            expr.apply(numpy.arange(3))
+
+    def test_reject_subscript(self):
+        expr = Expression('x[0] > 0')
+        with self.assertRaises(ValueError):
+            expr.apply(numpy.arange(3))
+
+    def test_reject_membership_test(self):
+        expr = Expression('x in (1, 2)')
+        with self.assertRaises(ValueError):
+            expr.apply(numpy.arange(3))
+
+    def test_keep_scalar_behavior(self):
+        expr = Expression('x < 1 or x > 2')
+        expr.apply(numpy.arange(3))
+        self.assertIs(True, expr(0))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -266,6 +266,24 @@ class TestAnnotations(ScriptTestCase):
         self.assertEqual(group[0]['a3'], '--a4')
         self.assertNotIn('a4', group[0])
 
+    def test_retain_annotations_resembling_compact_flag(self):
+
+        # given
+        command = ['group.py', 'filename',
+                   '--co', '3',
+                   '--compact-ish', 'yes',
+                   '--compact', 'no']
+
+        # when
+        output = self.execute(command)
+
+        # then
+        group = json.loads(output)
+        self.assertEqual(group[0]['co'], 3)
+        self.assertEqual(group[0]['compact-ish'], 'yes')
+        self.assertEqual(group[0]['compact'], 'no')
+        self.assertEqual(output, json.dumps(group, indent=4))
+
 
 class TestPipe(ScriptTestCase):
 
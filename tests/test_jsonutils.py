@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+import os
+import json
+import unittest
+
+from StringIO import StringIO
+from microanalyst.commons import jsonutils
+
+
+class TestDump(unittest.TestCase):
+
+    def setUp(self):
+        self.environ = os.environ.pop(jsonutils.COMPACT_VARIABLE, None)
+
+    def tearDown(self):
+        os.environ.pop(jsonutils.COMPACT_VARIABLE, None)
+        if self.environ is not None:
+            os.environ[jsonutils.COMPACT_VARIABLE] = self.environ
+
+    def dump(self, json_data, compact=None):
+        file_handle = StringIO()
+        jsonutils.dump(json_data, file_handle, compact)
+        return file_handle.getvalue()
+
+    def test_indent_and_sort_keys_by_default(self):
+
+        # given
+        json_data = {'b': [1, 2], 'a': {'c': None}}
+
+        # when
+        actual = self.dump(json_data)
+
+        # then
+        expected = json.dumps(json_data, indent=4, sort_keys=True) + '\n'
+        self.assertEqual(expected, actual)
+
+    def test_minify_compact_output(self):
+
+        # given
+        json_data = {'iterations': [{'spreadsheets': [{'values': [0.1]}]}]}
+
+        # when
+        actual = self.dump(json_data, compact=True)
+
+        # then
+        self.assertEqual('{"iterations":[{"spreadsheets":'
+                         '[{"values":[0.1]}]}]}\n', actual)
+
+    def test_round_trip_nested_data(self):
+
+        # given
+        json_data = {
+            u'genes': {u'001': {u'A1': u'za\u017c\xf3\u0142\u0107'}},
+            u'iterations': [
+                {
+                    u'control': {u'001': [u'A1']},
+                    u'spreadsheets': [
+                        {u'microplates': {u'001': {u'values': [
+                            1 / 3.0, 1e-17, None, 42
+                        ]}}}
+                    ]
+                },
+                {u'spreadsheets': []}
+            ]
+        }
+
+        # when
+        actual = json.loads(self.dump(json_data, compact=True))
+
+        # then
+        self.assertDictEqual(json_data, actual)
+
+    def test_write_shortest_round_trip_floats(self):
+
+        # when
+        actual = self.dump([0.1, 1 / 3.0], compact=True)
+
+        # then
+        self.assertEqual('[0.1,0.3333333333333333]\n', actual)
+
+    def test_enable_compact_output_with_environment_variable(self):
+
+        # given
+        os.environ[jsonutils.COMPACT_VARIABLE] = '1'
+
+        # when
+        actual = self.dump({'a': [1, 2]})
+
+        # then
+        self.assertEqual('{"a":[1,2]}\n', actual)
+
+    def test_override_environment_variable_with_flag(self):
+
+        # given
+        os.environ[jsonutils.COMPACT_VARIABLE] = '1'
+
+        # when
+        actual = self.dump({'a': 1}, compact=False)
+
+        # then
+        self.assertEqual('{\n    "a": 1\n}\n', actual)
+
+    def test_disable_compact_output_with_zero(self):
+
+        # given
+        os.environ[jsonutils.COMPACT_VARIABLE] = '0'
+
+        # then
+        self.assertFalse(jsonutils.is_compact())
+
+    def test_write_in_large_chunks(self):
+
+        # given
+        chunks = []
+
+        class FileHandle(object):
+            def write(self, text):
+                chunks.append(text)
+            def flush(self):
+                pass
+
+        json_data = [{'values': range(1000)} for i in xrange(100)]
+
+        # when
+        jsonutils.dump(json_data, FileHandle(), compact=True)
+
+        # then
+        self.assertEqual(1, len(chunks))
+        self.assertEqual(json_data, json.loads(chunks[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -22,10 +22,12 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import sys
 import unittest
 import numpy
 
 from random import random
+from StringIO import StringIO
 from microanalyst.model import Model
 from microanalyst.model.genes import Gene
 
@@ -282,6 +284,17 @@ class TestMicroplateNames(unittest.TestCase):
         # then
         self.assertListEqual(sorted(actual), actual)
 
+    def test_return_a_copy_of_microplate_names(self):
+
+        # given
+        model = TestModel.with_microplates([['001', '002']])
+
+        # when
+        model.microplate_names().append('003')
+
+        # then
+        self.assertListEqual(['001', '002'], model.microplate_names())
+
     def test_return_flat_list_if_no_spreadsheet_nor_iteration_defined(self):
 
         # given
@@ -1133,6 +1146,85 @@ class TestGenes(unittest.TestCase):
         self.assertEqual('001', actual.microplate_name)
         self.assertEqual('A1', actual.well_name)
 
+    def test_return_genes_on_a_fully_populated_microplate(self):
+
+        # given
+        names = ['gene%02d' % i for i in xrange(96)]
+        model = TestModel.with_genes({'001': dict(zip(Model.well_names(),
+                                                      names))})
+
+        # when
+        actual = model.genes(microplate='001')
+
+        # then
+        self.assertListEqual(names, actual)
+        self.assertEqual('A2', actual[1].well_name)
+        self.assertEqual('gene95', model.gene_at('H12', '001'))
+
+    def test_keep_first_instance_of_duplicate_gene(self):
+
+        # given
+        model = TestModel.with_genes({
+            '001': {'B1': 'foo'},
+            '002': {'A1': 'foo'}
+        })
+
+        # when
+        actual = model.genes()
+
+        # then
+        self.assertListEqual(['foo'], actual)
+        self.assertEqual(('001', 'B1'), actual[0]())
+
+    def test_return_genes_in_a_well_across_microplates(self):
+
+        # given
+        model = TestModel.with_genes({
+            '001': {'A1': 'foo', 'A2': 'bar'},
+            '002': {'A1': 'baz'}
+        })
+
+        # when
+        actual = model.genes(well='A1')
+
+        # then
+        self.assertListEqual(['baz', 'foo'], actual)
+
+    def test_warn_about_case_insensitive_duplicates(self):
+
+        # given
+        stderr, sys.stderr = sys.stderr, StringIO()
+
+        # when
+        try:
+            TestModel.with_genes({
+                '001': {'B1': 'Foo', 'A1': 'bar'},
+                '002': {'A1': 'fOO'}
+            })
+            actual = sys.stderr.getvalue()
+        finally:
+            sys.stderr = stderr
+
+        # then
+        self.assertEqual('Warning: duplicate gene "Foo" at '
+                         '("001"/B1), ("002"/A1)\n', actual)
+
+    def test_share_gene_names_between_wells(self):
+
+        # given
+        model = TestModel.with_genes({
+            '001': {'A1': 'foo'},
+            '002': {'C3': 'foo'}
+        })
+
+        # when
+        first, second = model.genes(microplate='001') + \
+                        model.genes(microplate='002')
+
+        # then
+        self.assertIs(first.name, second.name)
+        self.assertEqual(('002', 'C3'), second())
+
 
 class TestValues(unittest.TestCase):
 
@@ -1222,9 +1314,9 @@ class TestValues(unittest.TestCase):
         actual = model.values()
 
         # then
-        self.assertTrue((actual == model.array4d).all())
+        numpy.testing.assert_array_equal(actual, model.array4d)
 
-    def test_retain_none_values(self):
+    def test_retain_missing_values_as_nan(self):
 
         # given
         model = TestModel.with_random_values([['001', '002'], ['001']])
@@ -1233,7 +1325,30 @@ class TestValues(unittest.TestCase):
         actual = model.values(spreadsheet=1)
 
         # then
-        self.assertIn(None, list(actual[0][1]))
+        self.assertTrue(numpy.isnan(actual[0][1]).all())
+
+    def test_use_float_array_despite_missing_values(self):
+
+        # given
+        model = TestModel.with_random_values([['001', '002'], ['001']])
+
+        # when
+        actual = model.values()
+
+        # then
+        self.assertEqual(numpy.float64, actual.dtype)
+
+    def test_treat_empty_values_as_missing(self):
+
+        # given
+        model = TestModel.with_microplates([['001', '002']])
+
+        # when
+        actual = model.values()
+
+        # then
+        self.assertEqual((1, 1, 2, 96), actual.shape)
+        self.assertTrue(numpy.isnan(actual).all())
 
     def test_each_invocation_should_return_a_copy(self):
 
@@ -1257,7 +1372,7 @@ class TestValues(unittest.TestCase):
         copy2 = model.values(well='A1')
 
         # then
-        self.assertTrue((copy1 == copy2).all())
+        numpy.testing.assert_array_equal(copy1, copy2)
 
     def test_well_addressing(self):
 
@@ -1269,7 +1384,7 @@ class TestValues(unittest.TestCase):
         copy2 = model.values(well=33)
 
         # then
-        self.assertTrue((copy1 == copy2).all())
+        numpy.testing.assert_array_equal(copy1, copy2)
 
     def test_microplate_addressing(self):
 
@@ -1281,7 +1396,16 @@ class TestValues(unittest.TestCase):
         copy2 = model.values(microplate=1)
 
         # then
-        self.assertTrue((copy1 == copy2).all())
+        numpy.testing.assert_array_equal(copy1, copy2)
+
+    def test_raise_error_for_unknown_microplate(self):
+
+        # given
+        model = TestModel.with_random_values([['001', '002'], ['001']])
+
+        # then
+        with self.assertRaises(ValueError):
+            model.values(microplate='003')
 
     def test_do_not_confuse_iteration_zero_index_for_none(self):
 
@@ -1333,7 +1457,8 @@ class TestValues(unittest.TestCase):
         actual = model.values(microplate='002', spreadsheet=1, well='A1')
 
         # then
-        self.assertListEqual([None], list(actual))
+        self.assertEqual(1, len(actual))
+        self.assertTrue(numpy.isnan(actual[0]))
 
     def test_variable_number_of_spreadsheets_across_iterations(self):
 
@@ -1347,7 +1472,8 @@ class TestValues(unittest.TestCase):
 
         # then
         x = model.values(iteration=0, microplate='002', spreadsheet=1, well='A1')
-        self.assertListEqual([x, None], list(actual))
+        self.assertEqual(x, actual[0])
+        self.assertTrue(numpy.isnan(actual[1]))
 
     def test_pad_missing_spreadsheets_with_empty_stubs(self):
 
@@ -1617,6 +1743,81 @@ class TestValues(unittest.TestCase):
         self.assertEqual(model.array4d[1, 1, 1, 48], actual)
 
 
+class TestGeneValues(unittest.TestCase):
+
+    def test_match_values_of_individual_genes(self):
+
+        # given
+        model = TestModel.with_genes_and_random_values()
+
+        # when
+        actual = model.values_for_genes(['baz', 'foo', 'bar'])
+
+        # then
+        self.assertEqual((3, 2, 2), actual.shape)
+        for name, values in zip(['baz', 'foo', 'bar'], actual):
+            numpy.testing.assert_array_equal(model.gene(name).values(),
+                                             values)
+
+    def test_filter_by_iteration_and_spreadsheet(self):
+
+        # given
+        model = TestModel.with_genes_and_random_values()
+
+        # when
+        actual = model.values_for_genes(['foo', 'bar'], iteration=1)
+
+        # then
+        self.assertEqual((2, 2), actual.shape)
+        self.assertEqual(model.values(1, 1, '002', 'B2'), actual[1, 1])
+        self.assertEqual(model.values(0, 1, '001', 'A1'),
+                         model.values_for_genes(['FOO'], 0, 1)[0])
+
+    def test_return_empty_array_for_no_genes(self):
+
+        # given
+        model = TestModel.with_genes_and_random_values()
+
+        # when
+        actual = model.values_for_genes([])
+
+        # then
+        self.assertEqual((0, 2, 2), actual.shape)
+
+    def test_raise_error_for_unknown_gene(self):
+
+        # given
+        model = TestModel.with_genes_and_random_values()
+
+        # then
+        with self.assertRaises(KeyError):
+            model.values_for_genes(['foo', 'qux'])
+
+    def test_raise_error_for_gene_on_microplate_without_values(self):
+
+        # given
+        model = TestModel.with_genes_and_random_values()
+
+        # then
+        with self.assertRaises(ValueError):
+            model.values_for_genes(['baz', 'quux'])
+
+    def test_return_gene_matrix_of_used_genes(self):
+
+        # given
+        model = TestModel.with_genes_and_random_values()
+
+        # when
+        genes, values = model.gene_matrix(spreadsheet=0)
+
+        # then
+        self.assertListEqual(['bar', 'baz', 'foo'], genes)
+        self.assertEqual((3, 2), values.shape)
+        for gene, actual in zip(genes, values):
+            numpy.testing.assert_array_equal(gene.values(spreadsheet=0),
+                                             actual)
+
+
 class TestControl(unittest.TestCase):
 
     def test_microplate_addressing(self):
@@ -1633,6 +1834,15 @@ class TestControl(unittest.TestCase):
         # then
         self.assertTrue((copy1 == copy2).all())
 
+    def test_raise_error_for_unknown_microplate(self):
+
+        # given
+        model = TestModel.with_control_wells({'001': ['A1']})
+
+        # then
+        with self.assertRaises(ValueError):
+            model.is_control(0, 0, '003', 'A1')
+
     def test_none_mask_if_no_control_wells(self):
 
         # given
@@ -1766,6 +1976,103 @@ class TestControl(unittest.TestCase):
         # then
         self.assertListEqual(list(copy1), list(copy2))
 
+    def test_broadcast_iteration_mask_over_spreadsheets(self):
+
+        # given
+        model = self.with_spreadsheets({'001': ['A1']}, None, None, None)
+
+        # when
+        actual = model.control_mask.values
+
+        # then
+        self.assertEqual((1, 3, 2, 96), actual.shape)
+        self.assertEqual(0, actual.strides[1])
+        self.assertFalse(actual.flags.writeable)
+        self.assertEqual(3, actual[:, :, 0, 0].sum())
+        self.assertEqual(3, actual.sum())
+
+    def test_match_full_mask_for_every_query(self):
+
+        # given
+        model = self.with_spreadsheets({'001': ['A1']},
+                                       None,
+                                       {'002': ['B2']},
+                                       None)
+
+        # when
+        expected = model.control_mask.values
+
+        # then
+        for x in (None, 0):
+            for y in (None, 0, 1, 2):
+                for z in (None, 0, 1):
+                    for w in (None, 0, 13):
+                        index = tuple(slice(None) if i is None else i
+                                      for i in (x, y, z, w))
+                        numpy.testing.assert_array_equal(
+                            expected[index], model.control_mask(x, y, z, w))
+
+        self.assertEqual(4, expected.sum())
+        self.assertTrue(expected[0, 1, 1, 13])
+
+    def test_query_views_of_cached_mask(self):
+
+        # given
+        model = self.with_spreadsheets({'001': ['A1']},
+                                       None,
+                                       {'002': ['B2']},
+                                       None)
+
+        # when
+        everything = model.control_mask()
+        iteration = model.control_mask(0)
+
+        # then
+        self.assertIs(everything.base, iteration.base)
+        self.assertIs(model.control_mask.values, everything.base)
+        self.assertIs(model.control_mask.values, model.control_mask.values)
+
+    def test_accept_lowercase_addresses_and_indices_of_wells(self):
+
+        # given
+        model = TestModel.with_control_wells(
+            {'001': ['a1', 5, 'H12'], '002': ['a1', 5, 'H12']},
+            {'001': ['B1']})
+
+        # when
+        actual = model.control_mask
+
+        # then
+        self.assertListEqual(self.get_mask(0, 5, 95), list(actual[0, 0, 0]))
+        self.assertListEqual(self.get_mask(0, 5, 95), list(actual[0, 0, 1]))
+        self.assertListEqual(self.get_mask(12), list(actual[1, 0, 0]))
+        self.assertListEqual(self.get_mask(), list(actual[1, 0, 1]))
+
+    def test_raise_error_for_invalid_well_address(self):
+
+        # then
+        with self.assertRaises(AssertionError):
+            TestModel.with_control_wells({'001': ['I1']})
+
+    def with_spreadsheets(self, iteration_control, *spreadsheet_control):
+        """Model with one iteration and a spreadsheet per extra argument."""
+
+        spreadsheets = []
+        for control_wells in spreadsheet_control:
+            spreadsheets.append({
+                'filename': '',
+                'microplates': {'001': {'values': []}, '002': {'values': []}}
+            })
+            if control_wells:
+                spreadsheets[-1]['control'] = control_wells
+
+        return Model({
+            'iterations': [{
+                'control': iteration_control,
+                'spreadsheets': spreadsheets
+            }]
+        })
+
     def get_mask(self, *args):
 
         mask = [False] * 96
@@ -1842,6 +2149,72 @@ class TestSideEffect(unittest.TestCase):
         self.assertNotEqual(num_spreadsheets(json_data, 1),
                             num_spreadsheets(model.json_data, 1))
 
+    def test_no_side_effect_when_modifying_values_afterwards(self):
+
+        # given
+        values = [random() for i in xrange(96)]
+        json_data = {
+            'iterations': [
+                {
+                    'spreadsheets': [
+                        {
+                            'filename': 'iteration1/spreadsheet1.xls',
+                            'microplates': {
+                                '001': {
+                                    'values': values
+                                }
+                            }
+                        }
+                    ]
+                }
+            ]
+        }
+
+        model = Model(json_data)
+        expected = values[0]
+
+        # when
+        values[0] = -1.0
+
+        # then
+        self.assertEqual(expected, model.values(0, 0, '001', 'A1'))
+
+    def test_no_side_effect_when_modifying_json_data_afterwards(self):
+
+        # given
+        values = [random() for i in xrange(96)]
+        json_data = {
+            'iterations': [
+                {
+                    'spreadsheets': [
+                        {
+                            'filename': 'iteration1/spreadsheet1.xls',
+                            'microplates': {
+                                '001': {
+                                    'values': values
+                                }
+                            }
+                        }
+                    ]
+                }
+            ]
+        }
+
+        # when
+        model = Model(json_data)
+        spreadsheet = model.json_data['iterations'][0]['spreadsheets'][0]
+        spreadsheet['filename'] = 'renamed.xls'
+        spreadsheet['microplates']['001']['temperature'] = 23.6
+        spreadsheet['microplates']['002'] = {'values': []}
+
+        # then
+        expected = json_data['iterations'][0]['spreadsheets'][0]
+        self.assertEqual('iteration1/spreadsheet1.xls', expected['filename'])
+        self.assertListEqual(['001'], expected['microplates'].keys())
+        self.assertDictEqual({'values': values},
+                             expected['microplates']['001'])
+        self.assertIs(values, spreadsheet['microplates']['001']['values'])
+
 
 class TestModel(object):
     """Factory for microanalyst.model.Model instances."""
@@ -1918,6 +2291,25 @@ class TestModel(object):
 
         return Model({'iterations': iterations})
 
+    @staticmethod
+    def with_genes_and_random_values():
+        """Model with genes on two out of three microplates, which have
+           values in two iterations (two spreadsheets each).
+        """
+
+        model = TestModel.with_random_values(
+            [['001', '002'], ['001', '002']],
+            [['001', '002'], ['002']])
+
+        return Model({
+            'genes': {
+                '001': {'A1': 'foo', 'C3': 'baz'},
+                '002': {'B2': 'bar'},
+                '003': {'A1': 'quux'}
+            },
+            'iterations': model.json_data['iterations']
+        })
+
     @staticmethod
     def with_control_wells(*args):
         """Model with three iterations (one spreadsheet each):
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+import os
+import json
+import shutil
+import argparse
+import tempfile
+import unittest
+
+import xlrd
+
+from test_tecan import make_workbook
+from microanalyst import pipeline
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+
+        self.dirname = tempfile.mkdtemp()
+
+        for name in ('a.xls', 'b.xls', 'c.xls'):
+            make_workbook(self.path(name), ['001', '002'])
+
+        with open(self.path('control.json'), 'w') as file_handle:
+            json.dump({'001': ['A1']}, file_handle)
+
+        with open(self.path('genes.json'), 'w') as file_handle:
+            json.dump({'002': {'H12': 'foo'}}, file_handle)
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def path(self, filename):
+        return os.path.join(self.dirname, filename)
+
+    def test_group_with_annotations(self):
+
+        # when
+        actual = pipeline.group([self.path('*.xls')], {u'name': u'foo'})
+
+        # then
+        self.assertEqual(u'foo', actual[u'name'])
+        self.assertItemsEqual([self.path(x) for x in 'a.xls', 'b.xls', 'c.xls'],
+                              actual[u'files'])
+
+    def test_reject_mismatched_control(self):
+
+        # given
+        iterations = [{}, {}]
+
+        # when
+        with self.assertRaises(ValueError):
+            pipeline.control(iterations, [self.path('control.json')])
+
+    def test_reject_genes_for_non_object(self):
+        with self.assertRaises(TypeError):
+            pipeline.genes([], self.path('genes.json'))
+
+    def test_run_all_stages_in_process(self):
+
+        # given
+        iterations = [pipeline.group([self.path('a.xls'), self.path('b.xls')]),
+                      pipeline.group([self.path('c.xls')])]
+
+        # when
+        pipeline.control(iterations, [self.path('control.json'), '-'])
+        json_data = pipeline.assemble(iterations)
+        pipeline.genes(json_data, self.path('genes.json'))
+        model = pipeline.export(json_data, self.path('out.xlsx'), 'vertical')
+
+        # then
+        self.assertEqual((2, 2, 2, 96), model.array4d.shape)
+        self.assertTrue(model.is_control(0, 1, '001', 'A1'))
+        self.assertFalse(model.is_control(1, 0, '001', 'A1'))
+        self.assertEqual('foo', model.gene_at('H12', '002'))
+
+        sheet = xlrd.open_workbook(self.path('out.xlsx')).sheet_by_index(0)
+        self.assertEqual(1 + 2 * 96, sheet.nrows)
+        self.assertEqual(u'foo', sheet.cell_value(2 * 96, 2))
+
+    def test_replace_files_with_spreadsheets(self):
+
+        # given
+        iterations = [pipeline.group([self.path('*.xls')])]
+        pipeline.control(iterations, [self.path('control.json')])
+
+        # when
+        actual = pipeline.assemble(iterations)
+
+        # then
+        self.assertListEqual([self.path(x) for x in ('a.xls', 'b.xls', 'c.xls')],
+                             sorted(x[u'filename'] for x in
+                                    actual[u'iterations'][0][u'spreadsheets']))
+        self.assertNotIn(u'files', actual[u'iterations'][0])
+        self.assertEqual({u'001': [u'A1']},
+                         actual[u'iterations'][0][u'control'])
+
+    def test_get_cache_from_params(self):
+
+        # given
+        params = argparse.Namespace(no_cache=False,
+                                    cache_dir=self.path('cache'),
+                                    cache_size=1)
+
+        # when
+        actual = pipeline.get_cache(params)
+
+        # then
+        self.assertEqual(self.path('cache'), actual.dirname)
+        self.assertEqual(1024 * 1024, actual.max_size)
+
+    def test_disable_cache_from_params(self):
+        params = argparse.Namespace(no_cache=True)
+        self.assertIsNone(pipeline.get_cache(params))
+
+    def test_read_on_demand_from_params(self):
+
+        # given
+        params = argparse.Namespace(on_demand=True)
+
+        # when
+        reader = pipeline.get_reader(params)
+
+        # then
+        self.assertDictEqual({'on_demand': True}, reader.keywords)
+        self.assertItemsEqual([u'001', u'002'], reader(self.path('a.xls')))
+
+
+if __name__ == '__main__':
+    unittest.main()
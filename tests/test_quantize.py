@@ -22,6 +22,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+import copy
 import json
 import platform
 
@@ -118,6 +119,28 @@ class TestQuantize(ScriptTestCase):
                         for value in microplate['values']:
                             self.assertIsInstance(value, int)
 
+    def test_retain_missing_values(self):
+
+        with TempFile() as tmp:
+
+            # given
+            data = copy.deepcopy(_json_data)
+            microplates = data['iterations'][0]['spreadsheets'][0]['microplates']
+            microplates['001']['values'][0] = None
+            tmp.write(json.dumps(data))
+
+            cat = [self.cat_program, tmp.name()]
+            quantize = ['quantize.py']
+
+            # when
+            json_data = json.loads(self.pipe(cat, quantize))
+
+            # then
+            iteration = json_data['iterations'][0]
+            values = iteration['spreadsheets'][0]['microplates']['001']['values']
+            self.assertIsNone(values[0])
+            self.assertEqual(1, values[1])
+
     def test_dont_pad_missing_spreadsheets_with_empty_stubs(self):
 
         with TempFile() as tmp:
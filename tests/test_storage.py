@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+
+from microanalyst.model import Model, from_file, storage
+from commons import make_json_data
+
+
+class TestStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def path(self, filename):
+        return os.path.join(self.dirname, filename)
+
+    def reopen(self, model):
+        model.save(self.dirname)
+        return Model.open(self.dirname)
+
+    def test_retain_values(self):
+
+        # given
+        model = Model(get_json_data())
+
+        # when
+        actual = self.reopen(model)
+
+        # then
+        self.assertEqual(numpy.float64, actual.array4d.dtype)
+        self.assertTrue((model.values(iteration=0) == actual.values(iteration=0)).all())
+        self.assertEqual(model.values(1, 0, '001', 'H12'),
+                         actual.values(1, 0, '001', 'H12'))
+
+    def test_store_missing_microplates_as_nan(self):
+
+        # given
+        model = Model(get_json_data())
+
+        # when
+        actual = self.reopen(model)
+
+        # then
+        self.assertTrue(numpy.isnan(actual.values(1, 0, '002')).all())
+        self.assertTrue(numpy.isnan(actual.values(1, 1, '001')).all())
+
+    def test_retain_control_mask(self):
+
+        # given
+        model = Model(get_json_data())
+
+        # when
+        actual = self.reopen(model)
+
+        # then
+        self.assertTrue((model.control_mask.values ==
+                         actual.control_mask.values).all())
+        self.assertTrue(actual.is_control(0, 1, '002', 'B2'))
+
+    def test_retain_metadata(self):
+
+        # given
+        model = Model(get_json_data())
+
+        # when
+        actual = self.reopen(model)
+
+        # then
+        self.assertListEqual(model.filenames(), actual.filenames())
+        self.assertListEqual(model.microplate_names(),
+                             actual.microplate_names())
+        self.assertListEqual(model.microplate_names(1, 0),
+                             actual.microplate_names(1, 0))
+        self.assertListEqual(model.genes(), actual.genes())
+        self.assertEqual('bar', actual.json_data['foo'])
+
+    def test_drop_values_from_json(self):
+
+        # given
+        model = Model(get_json_data())
+
+        # when
+        actual = self.reopen(model)
+
+        # then
+        iteration = actual.json_data['iterations'][0]
+        microplate = iteration['spreadsheets'][0]['microplates']['001']
+        self.assertNotIn('values', microplate)
+        self.assertEqual(23.6, microplate['temperature'])
+
+    def test_convert_back_to_json(self):
+
+        # given
+        json_data = get_json_data()
+
+        # when
+        actual = storage.to_json(self.reopen(Model(json_data)))
+
+        # then
+        self.assertDictEqual(json_data, actual)
+
+    def test_open_memory_mapped(self):
+
+        # given
+        model = Model(get_json_data())
+        model.save(self.dirname)
+
+        # when
+        actual = Model.open(self.dirname, mmap=True)
+
+        # then
+        self.assertIsInstance(actual.array4d, numpy.memmap)
+        self.assertIsInstance(actual.control_mask.values, numpy.memmap)
+        self.assertTrue((model.values(iteration=0) == actual.values(iteration=0)).all())
+        self.assertTrue(actual.is_control(0, 1, '002', 'B2'))
+
+    def test_not_write_memory_mapped_changes_back(self):
+
+        # given
+        Model(get_json_data()).save(self.dirname)
+        model = Model.open(self.dirname, mmap=True)
+
+        # when
+        model.array4d[0, 0, 0, 0] = -1.0
+
+        # then
+        self.assertEqual(-1.0, model.values(0, 0, '001', 'A1'))
+        self.assertNotEqual(-1.0, Model.open(self.dirname).values(0, 0, '001', 'A1'))
+
+    def test_save_memory_mapped_in_place(self):
+
+        # given
+        Model(get_json_data()).save(self.dirname)
+        model = Model.open(self.dirname, mmap=True)
+        model.array4d[0, 0, 0, 0] = -1.0
+
+        # when
+        model.save(self.dirname)
+
+        # then
+        self.assertEqual(-1.0, Model.open(self.dirname).values(0, 0, '001', 'A1'))
+
+    def test_open_empty_model(self):
+
+        # given
+        model = Model({'iterations': []})
+
+        # when
+        actual = self.reopen(model)
+
+        # then
+        self.assertIsNone(actual.values())
+        self.assertListEqual([], actual.microplate_names())
+
+    def test_load_directory_with_from_file(self):
+
+        # given
+        Model(get_json_data()).save(self.dirname)
+
+        # when
+        actual = from_file(self.dirname)
+
+        # then
+        self.assertListEqual(['001', '002'], actual.microplate_names())
+
+    def test_recognize_only_saved_directories_as_containers(self):
+
+        # given
+        Model(get_json_data()).save(self.path('saved'))
+        os.mkdir(self.path('empty'))
+
+        # then
+        self.assertTrue(storage.is_container(self.path('saved')))
+        self.assertFalse(storage.is_container(self.path('empty')))
+        self.assertFalse(storage.is_container(self.path('missing.json')))
+
+
+def get_json_data():
+    return make_json_data(
+        [{'001': None, '002': None}, {'001': None, '002': None}],
+        [{'001': None}],
+        control={(0,): {'001': ['A1']}, (0, 1): {'002': ['B2']}},
+        genes={'001': {'A1': 'foo', 'B2': 'bar'}},
+        foo='bar')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+import json
+import unittest
+
+import numpy
+
+from random import random
+from microanalyst.model import Model, streaming
+from commons import make_json_data
+
+
+class TestStreaming(unittest.TestCase):
+
+    def test_match_model_built_from_json(self):
+
+        # given
+        json_data = get_json_data()
+        expected = Model(json_data)
+
+        # when
+        actual = Model.loads(json.dumps(json_data))
+
+        # then
+        numpy.testing.assert_array_equal(expected.array4d, actual.array4d)
+        numpy.testing.assert_array_equal(expected.control_mask.values,
+                                         actual.control_mask.values)
+        self.assertListEqual(expected.microplate_names(),
+                             actual.microplate_names())
+        self.assertListEqual(expected.filenames(), actual.filenames())
+        self.assertListEqual(expected.genes(), actual.genes())
+
+    def test_span_multiple_blocks(self):
+
+        # given
+        json_data = get_json_data()
+        expected = Model(json_data).array4d
+
+        # when
+        json_data, actual = streaming.parse(json.dumps(json_data),
+                                            block_size=2)
+
+        # then
+        numpy.testing.assert_array_equal(expected, actual)
+
+    def test_treat_empty_and_null_values_as_missing(self):
+
+        # given
+        json_data = get_json_data()
+
+        # when
+        json_data, actual = streaming.parse(json.dumps(json_data))
+
+        # then
+        self.assertTrue(numpy.isnan(actual[1, 0, 1]).all())
+        self.assertTrue(numpy.isnan(actual[0, 1, 1, 5]))
+        self.assertFalse(numpy.isnan(actual[0, 1, 1, 4]))
+
+    def test_strip_values_from_json(self):
+
+        # when
+        json_data, array4d = streaming.parse(json.dumps(get_json_data()))
+
+        # then
+        iteration = json_data['iterations'][0]
+        microplate = iteration['spreadsheets'][0]['microplates']['001']
+        self.assertNotIn('values', microplate)
+        self.assertEqual(23.6, microplate['temperature'])
+
+    def test_retain_annotations_with_values(self):
+
+        # given
+        json_data = get_json_data()
+        floats = [random() for i in xrange(95)] + [None]
+        json_data['note'] = {'values': [1, 2, 3]}
+        json_data['iterations'][0]['notes'] = [
+            {'values': floats},
+            {'values': range(96)}
+        ]
+
+        # when
+        actual = Model.loads(json.dumps(json_data))
+
+        # then
+        self.assertDictEqual({'values': [1, 2, 3]}, actual.json_data['note'])
+        notes = actual.json_data['iterations'][0]['notes']
+        self.assertListEqual(floats, notes[0]['values'])
+        self.assertListEqual(range(96), notes[1]['values'])
+        numpy.testing.assert_array_equal(Model(json_data).array4d,
+                                         actual.array4d)
+
+    def test_retain_annotations_with_values_in_empty_model(self):
+
+        # given
+        floats = [random() for i in xrange(96)]
+        text = json.dumps({'iterations': [], 'note': {'values': floats}})
+
+        # when
+        json_data, array4d = streaming.parse(text)
+
+        # then
+        self.assertListEqual(floats, json_data['note']['values'])
+
+    def test_parse_empty_model(self):
+
+        # when
+        json_data, array4d = streaming.parse('{"iterations": []}')
+
+        # then
+        self.assertIsNone(array4d)
+
+
+def get_json_data():
+
+    with_null = [random() for i in xrange(96)]
+    with_null[5] = None
+
+    return make_json_data(
+        [{'001': None, '002': None, '003': None},
+         {'001': None, '002': with_null}],
+        [{'002': [], '003': None}],
+        control={(0,): {'001': ['A1']}, (0, 1): {'002': ['B2']}},
+        genes={'001': {'A1': 'foo', 'B2': 'bar'}})
+
+
+if __name__ == '__main__':
+    unittest.main()
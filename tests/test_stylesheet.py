@@ -227,6 +227,19 @@ class TestCache(unittest.TestCase):
 
         self.assertNotEqual(xf_1, xf_2)
 
+    def test_memoize_equivalent_keyword_arguments(self):
+
+        # given
+        css = stylesheet.parse('.header { font-weight: bold } .alt { color: red }')
+        xf = css('.header', alt=True, odd=False)
+
+        # when
+        css._styles.clear()
+
+        # then
+        self.assertIs(xf, css('.header', alt=1))
+        self.assertIs(xf, css('.header', odd=0, alt='yes'))
+
     def test_dont_cache_unique_styles(self):
 
         # given
@@ -317,6 +330,19 @@ class TestOverride(unittest.TestCase):
         self.assertEqual(xf2, self.css1('.s2'))
         self.assertEqual(xf3, self.css1('.s3'))
 
+    def test_invalidate_memoized_records(self):
+
+        # given
+        xf1 = self.css1('.s1')
+
+        # when
+        self.css1.override(self.css2)
+
+        # then
+        self.assertIsNot(xf1, self.css1('.s1'))
+        self.assertEqual(self.css1.inline('font-weight: bold'),
+                         self.css1('.s1'))
+
 
 class TestWildcard(unittest.TestCase):
 
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+import xlwt
+
+from microanalyst.xls import tecan
+
+
+class TestRead(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dirname = tempfile.mkdtemp()
+        cls.filename = os.path.join(cls.dirname, 'tecan.xls')
+        make_workbook(cls.filename, ['001', '002'], extra_sheets=['Chart'])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.dirname)
+
+    def test_skip_invalid_worksheets(self):
+
+        # when
+        plates = tecan.read(self.filename)
+
+        # then
+        self.assertListEqual([u'001', u'002'], plates.names)
+
+    def test_return_float_array_of_microplates_and_wells(self):
+
+        # when
+        plates = tecan.read(self.filename)
+
+        # then
+        self.assertEqual((2, 96), plates.values.shape)
+        self.assertEqual(numpy.float64, plates.values.dtype)
+
+    def test_return_well_values_in_row_major_order(self):
+
+        # when
+        plates = tecan.read(self.filename)
+
+        # then
+        self.assertListEqual(get_values(0), list(plates.values[0]))
+        self.assertListEqual(get_values(1), list(plates.values[1]))
+
+    def test_parse_metadata(self):
+
+        # when
+        plates = tecan.read(self.filename)
+
+        # then
+        self.assertListEqual([u'2014-01-13T12:43:19', u'2014-01-13T12:44:19'],
+                             plates.timestamps)
+        self.assertListEqual([23.6, 23.6], plates.temperatures)
+
+    def test_read_the_same_plates_on_demand(self):
+
+        # when
+        eager = tecan.read(self.filename)
+        lazy = tecan.read(self.filename, on_demand=True)
+
+        # then
+        self.assertListEqual(eager.names, lazy.names)
+        self.assertListEqual(eager.timestamps, lazy.timestamps)
+        self.assertListEqual(eager.temperatures, lazy.temperatures)
+        self.assertTrue((eager.values == lazy.values).all())
+
+    def test_get_microplates(self):
+
+        # when
+        microplates = tecan.get_microplates(self.filename)
+
+        # then
+        self.assertItemsEqual([u'001', u'002'], microplates.keys())
+        self.assertDictEqual({
+            u'timestamp': u'2014-01-13T12:44:19',
+            u'temperature': 23.6,
+            u'values': get_values(1)
+        }, microplates[u'002'])
+
+
+def get_values(index):
+    return [index + i / 100.0 for i in xrange(96)]
+
+
+def make_workbook(filename, names, extra_sheets=()):
+    """Write a minimal Tecan(R) i-control(TM) spreadsheet file."""
+
+    workbook = xlwt.Workbook()
+
+    for i, name in enumerate(names):
+        sheet = workbook.add_sheet(name)
+        sheet.write(0, 0, tecan.SIGNATURE)
+        sheet.write(20, 1, '2014-01-13 12:%02d:19' % (43 + i))
+        sheet.write(22, 1, 'Temperature: 23.6 C')
+        for w, value in enumerate(get_values(i)):
+            sheet.write(24 + w / 12, 1 + w % 12, value)
+        sheet.write(35, 12, 'end')
+
+    for name in extra_sheets:
+        sheet = workbook.add_sheet(name)
+        sheet.write(0, 0, 'Summary')
+
+    workbook.save(filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+import os
+import re
+import shutil
+import tempfile
+import unittest
+import zipfile
+import multiprocessing
+
+import xlrd
+import xlwt
+
+from random import random
+from microanalyst.model import Model
+from microanalyst.xls import exporter, template, xlsx
+from commons import open_files_limit, make_json_data
+
+
+class TestParallelRendering(unittest.TestCase):
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.model = Model(get_json_data())
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def patch(self, obj, name, value):
+        """Replace an attribute of an object until the test is over."""
+        self.addCleanup(setattr, obj, name, getattr(obj, name))
+        setattr(obj, name, value)
+
+    def render(self, renderer, jobs):
+        """Return xlsx package rendered with a given number of jobs."""
+
+        filename = os.path.join(self.dirname, '%d.xlsx' % jobs)
+
+        workbook = xlsx.Workbook()
+        renderer.jobs = jobs
+        renderer.render(workbook)
+        workbook.save(filename)
+
+        return filename, workbook._styles._records
+
+    def assertSameCells(self, TemplateClass):
+
+        expected, actual = [
+            xlrd.open_workbook(
+                self.render(TemplateClass(self.model, colors=True), jobs)[0])
+            for jobs in (1, 2)
+        ]
+
+        self.assertListEqual(expected.sheet_names(), actual.sheet_names())
+        for name in expected.sheet_names():
+            expected_sheet = expected.sheet_by_name(name)
+            actual_sheet = actual.sheet_by_name(name)
+            self.assertEqual(expected_sheet.nrows, actual_sheet.nrows)
+            for row in xrange(expected_sheet.nrows):
+                self.assertListEqual(expected_sheet.row_values(row),
+                                     actual_sheet.row_values(row))
+
+    def test_render_same_cells_as_sequential(self):
+        self.assertSameCells(template.HorizontalTemplate)
+
+    def test_render_same_cells_as_sequential_in_vertical_layout(self):
+        self.assertSameCells(template.VerticalTemplate)
+
+    def test_render_same_styles_as_sequential(self):
+
+        # given
+        renderer = template.HorizontalTemplate(self.model, colors=True)
+        expected = get_cell_styles(*self.render(renderer, 1))
+
+        # when
+        actual = get_cell_styles(*self.render(renderer, 2))
+
+        # then
+        self.assertDictEqual(expected, actual)
+
+    def test_render_sequentially_where_processes_cannot_fork(self):
+
+        # given
+        self.patch(template, '_CAN_FORK', False)
+        self.patch(multiprocessing, 'Pool', None)
+
+        # then
+        self.assertSameCells(template.HorizontalTemplate)
+
+    def test_render_sequentially_when_workers_fail_to_start(self):
+
+        # given
+        def fail(*args):
+            raise OSError('Resource temporarily unavailable')
+
+        self.patch(multiprocessing, 'Pool', fail)
+
+        # then
+        self.assertSameCells(template.VerticalTemplate)
+
+    def test_reject_xls_workbook(self):
+
+        # given
+        renderer = template.HorizontalTemplate(self.model, jobs=2)
+
+        # then
+        with self.assertRaises(ValueError):
+            renderer.render(xlwt.Workbook())
+
+
+class TestManySheets(unittest.TestCase):
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.model = Model({
+            'iterations': [{
+                'spreadsheets': [{
+                    'filename': 'spreadsheet.xls',
+                    'microplates': {
+                        '%03d' % i: {'values': [random() for j in xrange(96)]}
+                        for i in xrange(100)
+                    }
+                }]
+            }]
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def export(self, extension):
+
+        filename = os.path.join(self.dirname, 'output' + extension)
+
+        with open_files_limit(64):
+            exporter.export(self.model, filename, template.HorizontalTemplate)
+
+        return xlrd.open_workbook(filename)
+
+    def test_export_many_xls_sheets(self):
+
+        # when
+        actual = self.export('.xls')
+
+        # then
+        self.assertEqual(100, actual.nsheets)
+        self.assertEqual(97, actual.sheet_by_name('099').nrows)
+
+    def test_export_many_xlsx_sheets(self):
+
+        # when
+        actual = self.export('.xlsx')
+
+        # then
+        self.assertEqual(100, actual.nsheets)
+        self.assertEqual(97, actual.sheet_by_name('099').nrows)
+
+    def test_remove_temporary_files_when_rendering_fails(self):
+
+        # given
+        spilled = []
+
+        class FailingTemplate(template.HorizontalTemplate):
+            def render(self, workbook):
+                super(FailingTemplate, self).render(workbook)
+                spilled.extend(x._filename for x in workbook._sheets)
+                raise RuntimeError('Rendering failed')
+
+        filename = os.path.join(self.dirname, 'output.xlsx')
+
+        # when
+        with self.assertRaises(RuntimeError):
+            exporter.export(self.model, filename, FailingTemplate)
+
+        # then
+        self.assertEqual(100, len(spilled))
+        self.assertFalse(any(os.path.exists(x) for x in spilled))
+
+
+def get_cell_styles(filename, records):
+    """Return {(sheet, cell): style record} of an xlsx package."""
+
+    result = {}
+
+    with zipfile.ZipFile(filename) as package:
+        for name in package.namelist():
+            if name.startswith('xl/worksheets/'):
+                xml = package.read(name)
+                for cell, index in re.findall(r'<c r="(\w+)" s="(\d+)"', xml):
+                    result[(name, cell)] = records[int(index)]
+
+    return result
+
+
+def get_json_data():
+    return make_json_data(
+        [{'001': None, '002': None, '003': None}] * 3,
+        control={(0,): {'001': ['A1'], '002': ['H12']}},
+        genes={'001': {'A1': 'foo', 'B2': 'bar'}})
+
+
+if __name__ == '__main__':
+    unittest.main()
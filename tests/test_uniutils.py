@@ -24,6 +24,7 @@
 
 import unittest
 
+from StringIO import StringIO
 from microanalyst.commons import uniutils
 
 
@@ -74,5 +75,60 @@ class TestEscapeUnicode(unittest.TestCase):
         self.assertEqual(uniutils.escape_unicode(src), dst)
 
 
+
+class TestRead(unittest.TestCase):
+
+    def test_return_ascii_input_intact(self):
+
+        # given
+        data = '{"foo": "\\u017c"}' * 1000
+
+        # when
+        actual = uniutils.read(StringIO(data))
+
+        # then
+        self.assertIsInstance(actual, str)
+        self.assertEqual(data, actual)
+
+    def test_decode_and_encode_with_utf8(self):
+
+        # given
+        text = u'za\u017c\xf3\u0142\u0107 g\u0119\u015bl\u0105 ja\u017a\u0144'
+
+        # when
+        actual = uniutils.read(StringIO(text.encode('iso8859-2')),
+                               'iso8859-2',
+                               chunk_size=4)
+
+        # then
+        self.assertEqual(text, actual.decode('utf-8'))
+
+    def test_decode_multibyte_characters_split_across_chunks(self):
+
+        # given
+        text = u'\u017c' * 10 + u'abc' + u'\u0142' * 10
+
+        # when
+        actual = uniutils.read(StringIO(text.encode('utf-8')), chunk_size=3)
+
+        # then
+        self.assertEqual(text, actual.decode('utf-8'))
+
+    def test_normalize_combining_characters_split_across_chunks(self):
+
+        # given
+        data = u'xyz\u0307 z\u0307'.encode('utf-8')
+
+        # when
+        for chunk_size in xrange(1, len(data) + 1):
+            actual = uniutils.read(StringIO(data), chunk_size=chunk_size)
+
+            # then
+            self.assertEqual(u'xy\u017c \u017c', actual.decode('utf-8'))
+
+    def test_read_empty_input(self):
+        self.assertEqual('', uniutils.read(StringIO('')))
+
+
 if __name__ == '__main__':
     unittest.main()
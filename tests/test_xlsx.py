@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+
+# The MIT License (MIT)
+#
+# Copyright (c) 2014 Bartosz Zaczynski
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+import xlrd
+
+from microanalyst.xls import stylesheet, xlsx
+from commons import open_files_limit
+
+
+class TestWorkbook(unittest.TestCase):
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dirname, 'output.xlsx')
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def reopen(self, workbook):
+        workbook.save(self.filename)
+        return xlrd.open_workbook(self.filename)
+
+    def test_retain_sheet_names_in_order(self):
+
+        # given
+        workbook = xlsx.Workbook()
+        workbook.add_sheet('Legend')
+        workbook.add_sheet(u'Micro\u017c<&>')
+
+        # when
+        actual = self.reopen(workbook)
+
+        # then
+        self.assertListEqual([u'Legend', u'Micro\u017c<&>'],
+                             actual.sheet_names())
+
+    def test_reject_duplicate_sheet_names(self):
+        workbook = xlsx.Workbook()
+        workbook.add_sheet('foo')
+        with self.assertRaises(ValueError):
+            workbook.add_sheet('FOO')
+
+    def test_write_cell_values(self):
+
+        # given
+        workbook = xlsx.Workbook()
+        sheet = workbook.add_sheet('foo')
+
+        # when
+        sheet.write(0, 0, u'za\u017c<&>')
+        sheet.write(0, 1, 0.1)
+        sheet.write(1, 0, 42)
+        sheet.write(1, 1, None)
+        sheet.write(2, 27, True)
+
+        # then
+        actual = self.reopen(workbook).sheet_by_index(0)
+        self.assertEqual(u'za\u017c<&>', actual.cell_value(0, 0))
+        self.assertEqual(0.1, actual.cell_value(0, 1))
+        self.assertEqual(42, actual.cell_value(1, 0))
+        self.assertEqual(xlrd.XL_CELL_EMPTY, actual.cell_type(1, 1))
+        self.assertEqual(xlrd.XL_CELL_BOOLEAN, actual.cell_type(2, 27))
+
+    def test_write_rows_in_any_order_before_flushing(self):
+
+        # given
+        workbook = xlsx.Workbook()
+        sheet = workbook.add_sheet('foo')
+
+        # when
+        sheet.write(2, 0, 'c')
+        sheet.write(0, 1, 'b')
+        sheet.write(0, 0, 'a')
+
+        # then
+        actual = self.reopen(workbook).sheet_by_index(0)
+        self.assertListEqual([u'a', u'b'], actual.row_values(0))
+        self.assertEqual(u'c', actual.cell_value(2, 0))
+
+    def test_reject_flushed_rows(self):
+
+        # given
+        workbook = xlsx.Workbook()
+        self.addCleanup(workbook.close)
+        sheet = workbook.add_sheet('foo')
+        sheet.write(0, 0, 'a')
+
+        # when
+        sheet.flush_row_data()
+
+        # then
+        with self.assertRaises(ValueError):
+            sheet.write(0, 1, 'b')
+
+    def test_exceed_xls_row_limit(self):
+
+        # given
+        workbook = xlsx.Workbook()
+        sheet = workbook.add_sheet('foo')
+
+        # when
+        for row in xrange(70000):
+            sheet.write(row, 0, row)
+            if row % 1000 == 0:
+                sheet.flush_row_data()
+
+        # then
+        actual = self.reopen(workbook).sheet_by_index(0)
+        self.assertEqual(70000, actual.nrows)
+        self.assertEqual(69999, actual.cell_value(69999, 0))
+
+    def test_write_column_widths(self):
+
+        # given
+        workbook = xlsx.Workbook()
+        sheet = workbook.add_sheet('foo')
+        sheet.write(0, 0, 'a')
+
+        # when
+        sheet.col(0).set_width(20 * 256)
+
+        # then
+        self.reopen(workbook)
+        with zipfile.ZipFile(self.filename) as package:
+            xml = package.read('xl/worksheets/sheet1.xml')
+        self.assertIn('<col min="1" max="1" width="20.00"', xml)
+
+    def test_append_rows_of_row_buffer(self):
+
+        # given
+        style = stylesheet.parse('.bold { font-weight: bold; }')('.bold')
+        workbook = xlsx.Workbook()
+        index = workbook.add_style(style)
+        sheet = workbook.add_sheet('foo')
+        sheet.write(0, 0, 'header')
+
+        buffer = workbook.row_buffer()
+        buffer.write(2, 0, 'c', style)
+        buffer.write(1, 0, 'b')
+
+        # when
+        sheet.append_row_data(*buffer.dump_row_data())
+
+        # then
+        actual = self.reopen(workbook).sheet_by_index(0)
+        self.assertListEqual([u'header', u'b', u'c'], actual.col_values(0))
+        with zipfile.ZipFile(self.filename) as package:
+            xml = package.read('xl/worksheets/sheet1.xml')
+        self.assertIn('<c r="A3" s="%d"' % index, xml)
+
+    def test_reject_appending_flushed_rows(self):
+
+        # given
+        workbook = xlsx.Workbook()
+        self.addCleanup(workbook.close)
+        sheet = workbook.add_sheet('foo')
+        sheet.write(5, 0, 'a')
+
+        buffer = workbook.row_buffer()
+        buffer.write(3, 0, 'b')
+
+        # then
+        with self.assertRaises(ValueError):
+            sheet.append_row_data(*buffer.dump_row_data())
+
+    def test_reject_style_not_added_up_front(self):
+
+        # given
+        style = stylesheet.parse('.bold { font-weight: bold; }')('.bold')
+        buffer = xlsx.Workbook().row_buffer()
+
+        # then
+        with self.assertRaises(ValueError):
+            buffer.write(0, 0, 'a', style)
+
+    def test_translate_styles(self):
+
+        # given
+        styles = stylesheet.parse("""
+            .header {
+                font-weight: bold;
+                color: white;
+                background-color: dark_red;
+                text-align: center;
+                border-color: gray25;
+                number-format: 0.000;
+            }
+        """)
+
+        workbook = xlsx.Workbook()
+        sheet = workbook.add_sheet('foo')
+
+        # when
+        sheet.write(0, 0, 1.5, styles('.header'))
+        sheet.write(0, 1, 1.5, styles('.header'))
+        sheet.write(0, 2, 1.5)
+
+        # then
+        self.reopen(workbook)
+        with zipfile.ZipFile(self.filename) as package:
+            xml = package.read('xl/styles.xml')
+            sheet_xml = package.read('xl/worksheets/sheet1.xml')
+        self.assertIn('<b/>', xml)
+        self.assertIn('<color indexed="9"/>', xml)
+        self.assertIn('<fgColor indexed="16"/>', xml)
+        self.assertIn('<alignment horizontal="center"/>', xml)
+        self.assertIn('<left style="thin"><color indexed="22"/></left>', xml)
+        self.assertIn('formatCode="0.000"', xml)
+        self.assertIn('<cellXfs count="2">', xml)
+        self.assertIn('<c r="B1" s="1">', sheet_xml)
+        self.assertIn('<c r="C1" s="0">', sheet_xml)
+
+    def test_remove_temporary_files(self):
+
+        # given
+        workbook = xlsx.Workbook()
+        sheet = workbook.add_sheet('foo')
+        sheet.write(0, 0, 'a')
+        sheet.flush_row_data()
+        filename = sheet._filename
+
+        # when
+        workbook.save(self.filename)
+
+        # then
+        self.assertFalse(os.path.exists(filename))
+
+    def test_remove_temporary_files_on_close(self):
+
+        # given
+        workbook = xlsx.Workbook()
+        sheet = workbook.add_sheet('foo')
+        sheet.write(0, 0, 'a')
+        sheet.flush_row_data()
+        filename = sheet._filename
+
+        # when
+        workbook.close()
+        workbook.close()
+
+        # then
+        self.assertFalse(os.path.exists(filename))
+
+    def test_not_keep_temporary_files_open(self):
+
+        # given
+        workbook = xlsx.Workbook()
+
+        # when
+        with open_files_limit(64):
+            for i in xrange(200):
+                sheet = workbook.add_sheet('sheet%d' % i)
+                sheet.write(0, 0, i)
+                sheet.flush_row_data()
+            actual = self.reopen(workbook)
+
+        # then
+        self.assertEqual(200, actual.nsheets)
+        self.assertEqual(199, actual.sheet_by_index(199).cell_value(0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()